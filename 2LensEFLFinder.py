@@ -8,56 +8,64 @@ Determines the 2 Lens system to obtain an EFL of 600mm with a desired magnificat
 @author: thomas
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
-from numpy import pi as pi
 import EFLTools as Tools
-from tqdm import tqdm
 from ThorLabsLenses import WavelengthAdapter
+import LensSearch as Search
+import RayTransfer as RT
+import Results
 
 def Finder2Lens(F1, F2, d1, tubeSize, inputBeam, fEff = 600, tolerance = 1e-1,
-                wavelength = 253e-6, transportDistance = 1200) :
+                wavelength = 253e-6, transportDistance = 1200, solver = 'grid') :
     # --- Extracting variables --- 
     x, alpha = inputBeam
     
-    #Creating a 3D Meshgrid to find all possible combinations of lens arrangements
-    f1, f2, d1 = np.meshgrid(F1, F2, d1, indexing ='xy')
+    if solver == 'exact':
+        #Solving the EFL for d1 directly, d1 only gives the range the spacing has to fall in
+        f1, f2 = np.meshgrid(F1, F2, indexing ='xy')
+        spacing = Search.SolveSpacing2Lens(f1, f2, fEff)
+        inside = (spacing >= np.min(d1)) & (spacing <= np.max(d1))
+        f1, f2, d1 = f1[inside], f2[inside], spacing[inside]
+    elif solver == 'grid':
+        #Creating a sparse 3D Meshgrid, the arrays broadcast to all possible lens arrangements
+        f1, f2, d1 = np.meshgrid(F1, F2, d1, indexing ='xy', sparse = True)
+    else:
+        raise ValueError(f"Unknown solver '{solver}', use 'grid' or 'exact'")
 
     # --- Preparing the Matrix Representations --- 
-    A = 1-d1/f1
-    B = d1
-    C = - (f1+f2-d1)/(f1*f2)
-    D = 1-d1/f2
+    system = RT.Compose(RT.Lens(f1), RT.Propagate(d1), RT.Lens(f2))
+    
+    f1, f2, d1 = np.broadcast_arrays(f1, f2, d1) # views, no copies of the grid
     
     # --- Determine the EFL for a 2 Lens system ---
-    EFL = 1 / (1/f1 + 1/f2 - d1/(f1 * f2))
+    EFL = RT.EFL(system)
 
     # --- Determine the Principal Plane distance from the last lens ---
-    H2 = (1-A)/C
+    H2 = RT.PrincipalPlane(system)
     
     # --- Finding Beam Widths --- 
     q0 = Tools.BuildingInput(inputBeam)
     
     # --- Determine the width of the beam at the second lens ---
-    qLens = (A * q0 + B)/(C* q0 + D)
+    qLens = RT.TransferQ(q0, system)
     
-    lensRadius = np.abs((-pi/wavelength * np.imag(1/qLens))**(-1/2))
+    lensRadius = RT.BeamRadius(qLens, wavelength)
     
     # --- Determine the beam width at the cathode --- 
-    #Finding the final Transfer Matrix parameters
-    Af = A + C * (H2 + fEff)
-    Bf = B + D * (H2 + fEff)
-    Cf, Df = C, D
-    
-    qPrime = (Af * q0 + Bf)/(Cf* q0 + Df)
+    #Propagating from the last lens to the focal plane of the system
+    qPrime = RT.TransferQ(q0, RT.Compose(system, RT.Propagate(H2 + fEff)))
 
     #print(qPrime)
-    finalRadius = np.abs((-pi/wavelength * np.imag(1/qPrime))**(-1/2))
+    finalRadius = RT.BeamRadius(qPrime, wavelength)
     #print(finalRadius)
     # --- Selecting Acceptable setups ---
     tubeLength = H2 + d1 - (transportDistance - fEff)  #total size of the system assuming thin lens 
+    if solver == 'exact':
+        correctEFL = np.isclose(EFL, fEff) # Only guards against round off in the solved spacing
+    else:
+        correctEFL = (fEff == np.round(EFL, 0))
     mask = (
-        (fEff == np.round(EFL, 0)) # We need the correct effective focal length 
+        correctEFL # We need the correct effective focal length 
         & 
         (np.abs(tubeLength) < tubeSize) #resticted by the size of the optical holder
         &
@@ -74,10 +82,11 @@ def Finder2Lens(F1, F2, d1, tubeSize, inputBeam, fEff = 600, tolerance = 1e-1,
     validEFL = EFL[mask]
     finalValidRadius = finalRadius[mask]
     print(f1[mask], f2[mask])
-    # --- Pairing up the pair wise valid solutions --- 
-    valid_pairs = list(zip(f1Valid, f2Valid, d1Valid, H2Valid, tubeValid, finalValidRadius, validEFL))
+    # --- Collecting the valid solutions in a structured array --- 
+    solutions = Results.Build(fEff, f1=f1Valid, f2=f2Valid, d1=d1Valid, H2=H2Valid, tubeLength=tubeValid,
+                              finalRadius=finalValidRadius, EFL=validEFL)
     
-    return valid_pairs
+    return solutions
 
 
 
@@ -7,13 +7,16 @@ Created on Thu Aug 15 16:41:51 2024
 """
 
 import numpy as np
-from numpy import pi as pi
 import EFLTools as Tools
 from tqdm import tqdm
 from ThorLabsLenses import WavelengthAdapter
-from itertools import product
+import LensSearch as Search
+import SolutionStore as Store
+import Results
 
-def Finder2Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200, wavelength=253e-6, magnification=2):
+def Stream3Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200, wavelength=253e-6, magnification=2,
+                solver='grid'):
+    # Generator over the solution batches (columns of Store.columns3Lens) as the blocks finish
     x, alpha = inputBeam
     
     
@@ -26,63 +29,32 @@ def Finder2Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200,
     d2_range = d2_range[d2_range <= max(F2)/3]
     print(len(d1_range), len(d2_range))
     
-    # We replace the 5D meshgrid with a generator to avoid creating huge arrays
-    valid_pairs = []
-    totalCombinations = len(F1) * len(F2) * len(F3) * len(d1_range) * len(d2_range)
-    
-    
-    
-    for f1, f2, f3, d1, d2 in tqdm(product(F1, F2, F3, d1_range, d2_range), total = totalCombinations):
-        # -------------- Determine appropriate distance ranges ----------------
-        if d1 > 2.5*f1 or d2 > f2/3:
-            continue
-        
-        # -------------- Determine the EFL for a 3 Lens system ----------------
-        EFL = (f1 * f2 * f3) / (f1 * f2 - d2 * (f1 + f2) + d1 * (d2 - f3) + f1 * f3 + f2 * f3)
-
-        # Remove invalid combinations early
-        if not np.isclose(fEff, EFL, atol=1.0):
-            continue
-
-        # Extract Transfer Matrix parameters
-        A = (d1 * (d2 - f2) + f1 * f2 - d2 * (f1 + f2)) / (f1 * f2)
-        B = (d1 + d2 - (d1 * d2) / f2)
-        C = (-f1 * f2 + d2 * (f1 + f2) - f1 * f3 - f2 * f3 + d1 * (-d2 + f2 + f3)) / (f1 * f2 * f3)
-        D = (d1 * (d2 - f2 - f3) + f2 * (-d2 + f3)) / (f2 * f3)
-
-        # Calculate Principal Plane distance from the last lens
-        H2 = (1 - A) / C
+    # The (f1, f2, f3) x d1 x d2 space is evaluated in vectorized blocks
+    # solver = 'exact' solves d2 from the EFL for every d1 instead of scanning d2_range
+    # solver = 'adaptive' only refines the d1 x d2 cells that can bracket fEff
+    f1, f2, f3 = Search.Triplets(F1, F2, F3)
+    feasible = Search.PruneTriplets(f1, f2, f3, d1_range, d2_range, 2.5 * f1, f2 / 3, fEff, tubeSize)
+    print(f'Pruned {np.sum(~feasible)} of {len(f1)} lens combinations')
+    f1, f2, f3 = f1[feasible], f2[feasible], f3[feasible]
+    q0 = Tools.BuildingInput(inputBeam)
+    levels = {}
+    blocks = Search.Search3Lens(f1, f2, f3, d1_range, d2_range, 2.5 * f1, f2 / 3, tubeSize, q0,
+                                fEff, wavelength, magnification * inputBeam[0], solver=solver, levels=levels)
+    yield from Store.LogHits(tqdm(blocks, desc='Evaluating Lens Blocks'))
+    for stride, (evaluated, kept) in sorted(levels.items(), reverse=True):
+        print(f'stride {stride:5d} : {evaluated:12d} evaluations, {kept:10d} kept')
 
-        # Calculate tube length and apply the tube size mask
-        tubeLength = d1 + d2 + H2
-        if tubeLength >= tubeSize:
-            continue
-        
-        # Calculate the beam widths at lens 2 and lens 3
-        q0 = Tools.BuildingInput(inputBeam)
-        qLens3 = (A * q0 + B) / (C * q0 + D)
-        lensRadius3 = np.abs((-pi / wavelength * np.imag(1 / qLens3)) ** (-1 / 2))
-
-        A2 = 1 - d1 / f1
-        B2 = d1
-        C2 = - (f1 + f2 - d1) / (f1 * f2)
-        D2 = 1 - d1 / f2
-
-        qLens2 = (A2 * q0 + B2) / (C2 * q0 + D2)
-        lensRadius2 = np.abs((-pi / wavelength * np.imag(1 / qLens2)) ** (-1 / 2))
-
-        # Apply width mask
-        if lensRadius2 > magnification * inputBeam[0] or lensRadius3 > magnification * inputBeam[0]:
-            continue
-         
-        # Output a valid solution on that run
-        valid_solution = (f1, f2, f3, d1, d2, H2, tubeLength, EFL)
-        print(valid_solution)
-        
-        # Save valid configuration
-        valid_pairs.append(valid_solution)
-
-    return valid_pairs
+def Finder2Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200, wavelength=253e-6, magnification=2,
+                solver='grid', output=None):
+    # output = path of an NPZ file, the solutions are then written as they come and only their count is returned
+    batches = Stream3Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff, wavelength, magnification,
+                          solver)
+    if output is not None:
+        return Store.StreamToNPZ(batches, output)
+    columns = [np.concatenate(column) for column in zip(*batches)] or [np.empty(0)] * 8
+    
+    # Collecting the valid solutions in a structured array once all the blocks are done
+    return Results.From3Lens(columns, fEff, Tools.BuildingInput(inputBeam), wavelength)
 
 if __name__ == "__main__":
     wavelength = 253e-6 # 253 nm in mm
@@ -8,73 +8,34 @@ Finding a 1200mm EFL lens system using parallel computing to speed up iterations
 @author: thomas
 """
 
+import sys
 import numpy as np
-from numpy import pi as pi
 import EFLTools as Tools
-from tqdm import tqdm
 from ThorLabsLenses import WavelengthAdapter
-from itertools import product
-from concurrent.futures import ProcessPoolExecutor, as_completed
-
-def compute_valid_pairs(f1, f2, f3, d1_range, d2_range, tubeSize, inputBeam, fEff, wavelength, magnification):
-    valid_pairs = []
-    x, alpha = inputBeam
-    
-
-    for d1, d2 in product(d1_range, d2_range):
-        if d1 > 2.5*f1 or d2 > f2:
-            continue
-
-        EFL = (f1 * f2 * f3) / (f1 * f2 - d2 * (f1 + f2) + d1 * (d2 - f3) + f1 * f3 + f2 * f3)
-
-        if not np.isclose(fEff, EFL, atol=1.0):
-            continue
-
-        A = (d1 * (d2 - f2) + f1 * f2 - d2 * (f1 + f2)) / (f1 * f2)
-        B = (d1 + d2 - (d1 * d2) / f2)
-        C = (-f1 * f2 + d2 * (f1 + f2) - f1 * f3 - f2 * f3 + d1 * (-d2 + f2 + f3)) / (f1 * f2 * f3)
-        D = (d1 * (d2 - f2 - f3) + f2 * (-d2 + f3)) / (f2 * f3)
-
-        H2 = (1 - A) / C
-        tubeLength = d1 + d2 + H2
-        if tubeLength >= tubeSize:
-            continue
-
-        q0 = Tools.BuildingInput(inputBeam)
-        qLens3 = (A * q0 + B) / (C * q0 + D)
-        lensRadius3 = np.abs((-pi / wavelength * np.imag(1 / qLens3)) ** (-1 / 2))
-
-        A2 = 1 - d1 / f1
-        B2 = d1
-        C2 = - (f1 + f2 - d1) / (f1 * f2)
-        D2 = 1 - d1 / f2
-
-        qLens2 = (A2 * q0 + B2) / (C2 * q0 + D2)
-        lensRadius2 = np.abs((-pi / wavelength * np.imag(1 / qLens2)) ** (-1 / 2))
-
-        if lensRadius2 > magnification * inputBeam[0] or lensRadius3 > magnification * inputBeam[0]:
-            continue
-
-        valid_solution = (f1, f2, f3, d1, d2, H2, tubeLength, EFL)
-        valid_pairs.append(valid_solution)
-
-    return valid_pairs
-
-def Finder2Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200, wavelength=253e-6, magnification=2):
-    totalCombinations = len(F1) * len(F2) * len(F3)
-    valid_pairs = []
-
-    with ProcessPoolExecutor() as executor:
-        futures = []
-        for f1, f2, f3 in tqdm(product(F1, F2, F3), total=totalCombinations):
-            futures.append(
-                executor.submit(compute_valid_pairs, f1, f2, f3, d1_range, d2_range, tubeSize, inputBeam, fEff, wavelength, magnification)
-            )
-
-        for future in tqdm(as_completed(futures), total=len(futures)):
-            valid_pairs.extend(future.result())
-
-    return valid_pairs
+import LensSearch as Search
+import ParallelSearch as Parallel
+import SolutionStore as Store
+import Results
+
+def Finder2Lens(F1, F2, F3, d1_range, d2_range, tubeSize, inputBeam, fEff=1200, wavelength=253e-6, magnification=2,
+                solver='grid', workers=None, output=None):
+    # Batches of lens combinations are spread over the pool, the d1/d2 grids are shared between workers
+    # output = path of an NPZ file, the solutions are then written as they come and only their count is returned
+    f1, f2, f3 = Search.Triplets(F1, F2, F3)
+    feasible = Search.PruneTriplets(f1, f2, f3, d1_range, d2_range, 2.5 * f1, f2, fEff, tubeSize)
+    print(f'Pruned {np.sum(~feasible)} of {len(f1)} lens combinations')
+    f1, f2, f3 = f1[feasible], f2[feasible], f3[feasible]
+    q0 = Tools.BuildingInput(inputBeam)
+
+    batches = Parallel.ParallelStream3Lens(f1, f2, f3, d1_range, d2_range, 2.5 * f1, f2, tubeSize, q0, fEff,
+                                           wavelength, magnification * inputBeam[0], solver=solver,
+                                           workers=workers)
+    batches = Store.LogHits(batches)
+    if output is not None:
+        return Store.StreamToNPZ(batches, output)
+    columns = [np.concatenate(column) for column in zip(*batches)] or [np.empty(0)] * 8
+
+    return Results.From3Lens(columns, fEff, q0, wavelength)
 
 if __name__ == "__main__":
     wavelength = 253e-6  # 253 nm in mm
@@ -85,5 +46,13 @@ if __name__ == "__main__":
     focals_1_inch = WavelengthAdapter(253, size='1 inch')
     fConcave, fConvex = [x for x in focals_1_inch if x < 0], [x for x in focals_1_inch if x >= 0]
 
-    effective = Finder2Lens(fConcave, fConvex, fConvex, d1, d2, 150, inputBeam, magnification=1.3)
-    print(len(effective))
+    if '--scaling' in sys.argv:
+        # Wall time from 1 to os.cpu_count() workers. Concave f1 never pass the d1 <= 2.5 f1 cap,
+        # so the scaling run uses convex f1 on a 0.1 mm grid to give every worker real work
+        f1, f2, f3 = Search.Triplets(fConvex, fConvex, fConcave)
+        dScaling = np.arange(5, 150, 0.1)
+        Parallel.MeasureScaling(f1, f2, f3, dScaling, dScaling, 2.5 * f1, f2, 150, Tools.BuildingInput(inputBeam),
+                                600, wavelength, 1.3 * inputBeam[0])
+    else:
+        effective = Finder2Lens(fConcave, fConvex, fConvex, d1, d2, 150, inputBeam, magnification=1.3)
+        print(len(effective))
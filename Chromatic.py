@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:20:48 2026
+
+Chromatic behaviour of finder solutions, every solution is evaluated over an array of
+wavelengths in one broadcast pass using the Sellmeier model of each lens material
+
+@author: thomas
+"""
+
+import numpy as np
+import RayTransfer as RT
+import EFLTools as Tools
+from ThorLabsLenses import catalog, materials, lensMaker
+
+def Materials(focals, designWavelength=253):
+    # Material of every focal found in the catalog at the design wavelength (nm), 'FS' when not found
+    focals = np.asarray(focals, dtype=float)
+    found = np.full(focals.shape, 'FS', dtype='U4')
+    for material, index in materials.items():
+        rows = catalog['material'] == material
+        table = lensMaker(index(designWavelength), catalog['R'][rows], np.inf)
+        match = np.isclose(focals[..., None], table, rtol=1e-12, atol=0).any(axis=-1)
+        found[match] = material
+    return found
+
+def FocalRatio(lensMaterials, wavelengths, designWavelength=253):
+    # f(wavelength) / f(design) = (n(design) - 1) / (n(wavelength) - 1) for a fixed lens shape
+    # Returns wavelengths.shape + lensMaterials.shape
+    wavelengths = np.asarray(wavelengths, dtype=float)
+    lensMaterials = np.asarray(lensMaterials)
+    ratio = np.ones(wavelengths.shape + lensMaterials.shape)
+    for material, index in materials.items():
+        rows = lensMaterials == material
+        perWavelength = (index(designWavelength) - 1) / (index(wavelengths) - 1)
+        ratio[..., rows] = perWavelength[..., None]
+    return ratio
+
+def Systems(solutions):
+    # (focals, distances) of a Results.SolutionSet, 2 lens sets have NaN in f3 and d2
+    if np.all(np.isnan(solutions['f3'])):
+        return np.stack([solutions['f1'], solutions['f2']], axis=-1), np.asarray(solutions['d1'])[:, None]
+    return (np.stack([solutions['f1'], solutions['f2'], solutions['f3']], axis=-1),
+            np.stack([solutions['d1'], solutions['d2']], axis=-1))
+
+def Evaluate(solutions, wavelengths, inputBeam, designWavelength=253, lensMaterials=None):
+    # wavelengths in nm, lengths in mm. Returns a dictionary of (W, S) arrays, radii is (W, S, N)
+    # focalPlane is measured from the last lens, focalShift is relative to the design wavelength and
+    # finalRadius is the beam radius at the design focal plane
+    focals, distances = Systems(solutions)
+    if lensMaterials is None:
+        lensMaterials = Materials(focals, designWavelength)
+    wavelengths = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    allWavelengths = np.concatenate([[designWavelength], wavelengths])
+    lambdaMM = allWavelengths[:, None] * 1e-6
+
+    # --- Every (wavelength, solution) system at once ---
+    chromaticFocals = focals * FocalRatio(lensMaterials, allWavelengths, designWavelength)
+    q0 = Tools.BuildingInput(inputBeam, wavelength=lambdaMM)
+    EFL, H2, radii = RT.Evaluate(chromaticFocals, distances, q0, lambdaMM[..., None])
+    focalPlane = H2 + EFL
+
+    system = RT.SystemMatrix(chromaticFocals, distances)
+    qFinal = RT.TransferQ(q0, RT.Compose(system, RT.Propagate(focalPlane[0])))
+    return {'wavelengths': wavelengths, 'EFL': EFL[1:], 'H2': H2[1:], 'radii': radii[1:],
+            'focalPlane': focalPlane[1:], 'focalShift': focalPlane[1:] - focalPlane[0],
+            'finalRadius': RT.BeamRadius(qFinal, lambdaMM)[1:]}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:11:36 2026
+
+Numba kernels for the EFL scan of the 3 lens grid search, used by LensSearch when numba is installed
+The scan walks every (f1, f2, f3, d1) row with prange and checks d2 point by point, with the
+same arithmetic as LensSearch.ThreeLensPower so the selected points are identical
+
+@author: thomas
+"""
+
+import math
+import numpy as np
+
+try:
+    import numba
+except ImportError: # the kernels stay plain Python loops, only usable on tiny grids
+    numba = None
+
+available = numba is not None
+prange = numba.prange if available else range
+threads = True # prange over numba threads, process pool workers turn it off since forked children can't share them
+
+def _Compile(parallel=False):
+    def decorate(function):
+        if not available:
+            return function
+        return numba.njit(parallel=parallel, cache=True, error_model='numpy')(function)
+    return decorate
+
+@_Compile()
+def _Front(f1, f2, d1):
+    # A and C of Lens(f2) @ Propagate(d1) @ Lens(f1), in the order RayTransfer.Compose evaluates them
+    a, b = -1.0 / f1, -1.0 / f2
+    M00 = 1.0 + d1 * a
+    return M00, b * M00 + a
+
+@_Compile()
+def _Hit(F00, F10, f3, d2, fEff):
+    # EFL of the system when it passes the isclose(fEff, EFL, atol=1) test of ThreeLensBlock, else NaN
+    c = -1.0 / f3
+    C = c * F00 + (c * d2 + 1.0) * F10
+    if C == 0.0:
+        return np.nan
+    EFL = -1.0 / C
+    if math.isfinite(EFL) and abs(fEff - EFL) <= 1.0 + 1e-5 * abs(EFL):
+        return EFL
+    return np.nan
+
+def _CountRows(f1, f2, f3, d1, d2, d1Max, d2Max, fEff, counts):
+    n1 = d1.shape[0]
+    for r in prange(f1.shape[0] * n1):
+        t, i = r // n1, r % n1
+        found = 0
+        if d1[i] <= d1Max[t]:
+            F00, F10 = _Front(f1[t], f2[t], d1[i])
+            for j in range(d2.shape[0]):
+                if d2[j] <= d2Max[t] and not math.isnan(_Hit(F00, F10, f3[t], d2[j], fEff)):
+                    found += 1
+        counts[r] = found
+
+def _FillRows(f1, f2, f3, d1, d2, d1Max, d2Max, fEff, offsets, T, I, J, EFL):
+    n1 = d1.shape[0]
+    for r in prange(f1.shape[0] * n1):
+        t, i = r // n1, r % n1
+        k = offsets[r]
+        if d1[i] <= d1Max[t]:
+            F00, F10 = _Front(f1[t], f2[t], d1[i])
+            for j in range(d2.shape[0]):
+                if d2[j] <= d2Max[t]:
+                    hit = _Hit(F00, F10, f3[t], d2[j], fEff)
+                    if not math.isnan(hit):
+                        T[k], I[k], J[k], EFL[k] = t, i, j, hit
+                        k += 1
+
+_kernels = {parallel: (_Compile(parallel)(_CountRows), _Compile(parallel)(_FillRows)) for parallel in (False, True)}
+
+def ScanEFL(f1, f2, f3, d1, d2, d1Max, d2Max, fEff):
+    # (t, i, j, EFL) of the grid points with the correct EFL inside the caps, in product order
+    # Two passes, the first counts the hits of every row so the second writes them in place
+    args = tuple(np.ascontiguousarray(x, dtype=float) for x in (f1, f2, f3, d1, d2, d1Max, d2Max))
+    CountRows, FillRows = _kernels[threads]
+    counts = np.zeros(len(f1) * len(d1), dtype=np.int64)
+    CountRows(*args, float(fEff), counts)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    n = int(counts.sum())
+    T, I, J, EFL = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64), np.empty(n)
+    FillRows(*args, float(fEff), offsets, T, I, J, EFL)
+    return T, I, J, EFL
+
+if __name__ == "__main__":
+    # Benchmark against the NumPy kernel on the scaling inputs of 3LensEFL_Fast
+    import time
+    import EFLTools as Tools
+    import LensSearch as Search
+    from ThorLabsLenses import WavelengthAdapter
+    focals_1_inch = WavelengthAdapter(253, size='1 inch')
+    fConcave, fConvex = [x for x in focals_1_inch if x < 0], [x for x in focals_1_inch if x >= 0]
+    f1, f2, f3 = Search.Triplets(fConvex, fConvex, fConcave)
+    d = np.arange(5, 150, 0.1)
+    q0 = Tools.BuildingInput([4, 4e-4])
+    results = {}
+    for compiled in (False, True):
+        if compiled and not available:
+            print('numba is not installed')
+            break
+        Search.useNumba = compiled
+        Search.Search3Lens(f1[:1], f2[:1], f3[:1], d[:10], d[:10], 2.5 * f1[:1], f2[:1], 150, q0, 600,
+                           253e-6, 5.2).__next__() if compiled else None # compiles outside the timing
+        start = time.perf_counter()
+        columns = [np.concatenate(c) for c in zip(*Search.Search3Lens(f1, f2, f3, d, d, 2.5 * f1, f2, 150, q0, 600,
+                                                                      253e-6, 5.2))]
+        results[compiled] = columns
+        print(f"{'numba' if compiled else 'numpy'} : {time.perf_counter() - start:8.2f} s")
+    if len(results) == 2:
+        print('identical :', all(np.array_equal(a, b) for a, b in zip(results[False], results[True])))
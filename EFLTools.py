@@ -7,17 +7,10 @@ Tool Functions for EFL uses
 
 @author: thomas
 """
-import sympy as sp
-import matplotlib.pyplot as plt
 import numpy as np
 from numpy import pi as pi
-from tqdm import tqdm
-from matplotlib.colors import LogNorm
-from matplotlib.colors import LinearSegmentedColormap
-from cmocean import cm
-import seaborn as sns
-from matplotlib.colors import Normalize
 from ThorLabsLenses import WavelengthAdapter
+import RayTransfer as RT
 
 # --- Globals ---
 inch1 = 25.4 # in mm
@@ -36,20 +29,18 @@ def BuildingInput(inputBeam, wavelength = 253e-9):
     return qZ
 
 def Lens(f):
-    return np.array([[1,0],[-1/f, 1]])
+    return RT.Lens(f)
 
 def Propagate(z):
-    return np.array([[1, z],[0, 1]])
+    return RT.Propagate(z)
 
 def Transfer(inputQ, transferMatrix):
     
-    # --- Extracting the Parameters ---
-    (A,B),(C,D) = transferMatrix[0], transferMatrix[1]
     # --- Applying the transfer Matrix ---
-    qPrime = (A * inputQ + B)/(C*inputQ + D)
+    qPrime = RT.TransferQ(inputQ, np.asarray(transferMatrix))
     
     # --- Extracting new parameters for the beam ---
-    w_z = np.abs((-pi/wavelength * np.imag(1/qPrime))**(-1/2))
-    R_z = ((1/qPrime).real)**(-1)
+    w_z = RT.BeamRadius(qPrime, wavelength)
+    R_z = RT.CurvatureRadius(qPrime)
     
     return qPrime, w_z, R_z
\ No newline at end of file
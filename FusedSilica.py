@@ -7,7 +7,6 @@ Created on Wed Jul 24 16:49:55 2024
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 def FusedSilica(wavelength_nm):
     # Convert wavelength from nm to micrometers
@@ -30,6 +29,7 @@ def CalciumFluoride(wavelength_nm):
     return n 
 
 def plot_refractive_index():
+    import matplotlib.pyplot as plt # only needed for the plot, keeps the Sellmeier functions light
     # Define wavelength ranges
     wavelengths_full = np.linspace(200, 7000, 1000)
     wavelengths_zoomed = np.linspace(200, 800, 1000)
@@ -8,16 +8,10 @@ Created on Tue Jul 23 09:18:06 2024
 @author: thomas
 """
 
-import sympy as sp
-import matplotlib.pyplot as plt
 import numpy as np
 from numpy import pi as pi
-from tqdm import tqdm
-from matplotlib.colors import LogNorm
-from matplotlib.colors import LinearSegmentedColormap
-from cmocean import cm
-import seaborn as sns
-from matplotlib.colors import Normalize
+import RayTransfer as RT
+# matplotlib, cmocean and seaborn are only imported by the plotting functions
 
 
 # --- Globals ---
@@ -35,67 +29,41 @@ def fluka_color_map(self):
                    (0.0, 0.0, 1.0), (0.0, 0.6, 1.0), (0.0, 0.8, 1.0), (0.0, 0.7, 0.5), (0.0, 0.9, 0.2), (0.5, 1.0, 0.0), (0.8, 1.0, 0.0),
                    (1.0, 1.0, 0.0), (1.0, 0.8, 0.0), (1.0, 0.5, 0.0), (1.0, 0.0, 0.0), (0.8, 0.0, 0.0), (0.6, 0.0, 0.0), (0.0, 0.0, 0.0)]
         cmap_name = 'fluka'
+        from matplotlib.colors import LinearSegmentedColormap
 
         return LinearSegmentedColormap.from_list(cmap_name, flukacolors, N=300)
 
 
 def Transfer(inputQ, transferMatrix):
     
-    # --- Extracting the Parameters ---
-    (A,B),(C,D) = transferMatrix[0], transferMatrix[1]
     # --- Applying the transfer Matrix ---
-    qPrime = (A * inputQ + B)/(C*inputQ + D)
+    qPrime = RT.TransferQ(inputQ, np.asarray(transferMatrix))
     
     # --- Extracting new parameters for the beam ---
-    w_z = np.abs((-pi/wavelength * np.imag(1/qPrime))**(-1/2))
-    R_z = ((1/qPrime).real)**(-1)
+    w_z = RT.BeamRadius(qPrime, wavelength)
+    R_z = RT.CurvatureRadius(qPrime)
     
     return qPrime, w_z, R_z
     
 def Lens(f):
-    return np.array([[1,0],[-1/f, 1]])
+    return RT.Lens(f)
 
 def Propagate(z):
-    return np.array([[1, z],[0, 1]])
+    return RT.Propagate(z)
 
 
 def BeamPlotting(distances, focals, inputBeam, sampling):
     
-    BuildingInput() #This function finds the inputQ for a given width and divergence
-    Qs, Ws = waistIdentification()
-    intensityMatching()
+    PlotTrace(trace(distances, focals, inputBeam, sampling), distances, inputBeam)
     return
 
 
 
 def waistIdentification(distances, focals, inputQ, sampling):
-    
-    # --- Extracting the data ---
-    A, B, C = (Propagate(d) for d in distances)
-    lenses = [Lens(f) for f in focals]
-    
-    totalTravel = 0
-    totalTransfer = np.eye(2)
-    Qs = [[inputQ]]
-    Ws = [w0]
-    for i, d in tqdm(enumerate(distances), desc = 'Iterating Through Optical System'):
-        
-        Z = np.arange(0, d + sampling, sampling)
-        D = [Propagate(z) for z in Z]
-       
-        #Create an array of transfer matrices to apply to 
-        transferMatrix = [d @ lenses[i] @ totalTransfer for d in D]
-
-        #Extracting the parameters for each iteration of the propagated gaussian
-        transfered = [Transfer(Qs[0][0], T) for T in transferMatrix]
-        qs, ws, _ = np.array(transfered).T
-        #Preparing for next iteration
-        totalTravel += d
-        totalTransfer = D[-1] @ lenses[i] @ totalTransfer 
-        
-        Qs += [qs]
-        Ws += [ws.real]
-    return Qs[1:], Ws[1:]
+    # Per segment lists of q and w(z) from the analytic trace in RayTransfer
+    _, q, w, _, starts = RT.Trace(inputQ, focals, distances, sampling, wavelength)
+    Qs, Ws = np.split(q, starts[1:]), np.split(w, starts[1:])
+    return Qs, Ws
 
 
 def intensityMatching(Qs, inputBeam, k0 = k0, ySampling = 1e4):
@@ -110,6 +78,27 @@ def intensityMatching(Qs, inputBeam, k0 = k0, ySampling = 1e4):
     
     return gaussianCut
 
+def RenderIntensity(qArray, inputBeam, k0 = k0, ySampling = 1e4, width = 2000, memoryBudget = 256e6):
+    #Column normalized intensity image (ySampling, width) in float32, the trace is downsampled to width columns
+    #|1/sqrt(q) exp(-i k0 y^2 / 2q)|^2 = exp(k0 y^2 Im(1/q)) / |q| and 1/|q| cancels in the normalization
+    qArray = np.asarray(qArray)
+    columns = np.unique(np.linspace(0, len(qArray) - 1, min(width, len(qArray))).round().astype(int))
+    b = (k0 * np.imag(1 / qArray[columns])).astype(np.float32)
+
+    inputWidth, _ = inputBeam
+    ySquared = np.linspace(-4*inputWidth, 4*inputWidth, int(ySampling)).astype(np.float32)**2
+    image = np.empty((len(ySquared), len(columns)), dtype=np.float32)
+
+    #Tiles of columns, each float32 temporary of a tile stays within the memory budget
+    tile = max(int(memoryBudget // (2 * 4 * len(ySquared))), 1)
+    for start in range(0, len(columns), tile):
+        block = image[:, start:start + tile]
+        np.multiply(ySquared[:, None], b[None, start:start + tile], out=block)
+        np.exp(block, out=block)
+        total = block.sum(axis=0, dtype=np.float64)
+        np.divide(block, np.where(total > 0, total, np.inf).astype(np.float32), out=block)
+    return image, columns
+
 def BuildingInput(inputBeam, wavelength = 253e-6):
     wZ, alpha = inputBeam
     z = wZ / np.tan(2*alpha)
@@ -123,100 +112,90 @@ def BuildingInput(inputBeam, wavelength = 253e-6):
 
 
 
-# --- Initialization from EFL Finder ---
-######
-#Input the Parameters from Finder function for the trace in the following 
-######
-focal1, focal2, d1, H2, _, _, fEff = (np.float64(-90.9360446598327),
-                                     np.float64(113.67005582479086),
-                                     np.float64(34.224999999997166),
-                                     np.float64(338.55725703435),
-                                     np.float64(72.7822570343472),
-                                     np.float64(0.006563747709002257),
-                                     np.float64(899.5488048382368))
-focals = [focal1, np.inf, focal2]
-distances = [d1, 0, H2 + fEff]
-
-# --- Initialization ---
-#v0 = np.array([4, 4e-4])
-'''distances = [14.87499999999979 - 7,7,130.7657770539688 +1199.92437887587]
-focals = np.array([-136.49500303440888, -9000, 135.9098493557282])'''
-#distances = [-69.8263 + 152.812, 0, 75]
-#focals = np.array([-69.8263, np.inf, 152.812])
-inputBeam = [4, 1e-4]
-#inputQ = -200 + 1j * pi / wavelength * w0**2
-inputQ = BuildingInput(inputBeam)
-sampling = 0.1
-ySampling = 1e4
-
-
-
-# --- Waist Identification ---
-Qs, Ws = waistIdentification(distances, focals, inputQ, sampling)   
-#print(list(Qs[0][0:5]))
-# --- Concatenate and Plot Beam Widths ---
-ws = np.concatenate(Ws)
-
-# --- Intensity Matching and Plot ---
-norm = Normalize(vmin=0, vmax=30 / ySampling)
-gaussians = intensityMatching(Qs[:], inputBeam, ySampling = ySampling)
-data = np.abs(gaussians)**2
-totalIntensity = np.sum(data, axis=0)
-cmaps = [cm.curl, cm.thermal, cm.dense, 'mako', cm.solar, cm.haline, 'GnBu_r']
-
-fig = plt.figure(figsize=(20, 10))
-ax = fig.add_subplot()
-ax1 = ax.imshow(data / totalIntensity, aspect='auto', cmap=cmaps[0],
-           extent=[1200 - np.sum(distances), 1200, -4 * inputBeam[0], 4 * inputBeam[0]], norm = norm)
-fig.colorbar(ax1, ax = ax)
-
-
-# --- Plot the Widths on Top of the Intensity Plot ---
-z_positions = np.linspace(1200 - np.sum(distances), 1200, len(ws))
-colors = ['white', 'red', 'red']
-start_idx = 0
-
-for i, color in enumerate(colors):
-    end_idx = start_idx + len(Ws[i])
-    plt.plot(z_positions[start_idx:end_idx], Ws[i], color=color, linestyle='--',
-             linewidth=1.3, label=r'Width ($1/e^2$)' if i == 0 else "")
-    plt.plot(z_positions[start_idx:end_idx], -Ws[i], color=color, linestyle='--', linewidth=1.3)
-    start_idx = end_idx
-print(Ws[0][-1])
-# --- Adding a text box ---
-'''textstr = f'Final Beam Height = {Ws[-1][-1]:.6g}mm'
-props = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
-plt.text(00, -28, textstr, fontsize=10,
-        verticalalignment='top', bbox=props)'''
-plt.axvline(x=0, color = 'black', linestyle = '--')
-# --- Add Labels, Title, and Legend ---
-plt.xlabel('Propagation distance (mm)', fontsize = 30)
-plt.ylabel('Transverse position (mm)', fontsize = 30)
-#plt.title('Beam Propagation through 3 Lens System', fontsize = 40)
-plt.legend(fontsize = 20)
-plt.show()
-
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
\ No newline at end of file
+def trace(distances, focals, inputBeam, sampling = 0.1, ySampling = 1e4, width = 2000, render = True):
+    #Gaussian trace of a thin lens system, segment i starts at lens i and covers distances[i]
+    #Returns a dictionary of z, q, w, R, the per segment Qs and Ws, and the intensity image if render
+    inputQ = BuildingInput(inputBeam) #This function finds the inputQ for a given width and divergence
+    z, q, w, R, starts = RT.Trace(inputQ, focals, distances, sampling, wavelength)
+    result = {'z': z, 'q': q, 'w': w, 'R': R, 'starts': starts,
+              'Qs': np.split(q, starts[1:]), 'Ws': np.split(w, starts[1:]), 'ySampling': ySampling}
+    if render:
+        result['image'], result['columns'] = RenderIntensity(q, inputBeam, ySampling = ySampling, width = width)
+    return result
+
+def PlotTrace(result, distances, inputBeam, endPosition = 1200, show = True):
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import Normalize
+    from cmocean import cm
+    import seaborn as sns # registers the 'mako' colormap
+    Ws, ySampling = result['Ws'], result['ySampling']
+    ws = result['w']
+
+    # --- Intensity Matching and Plot ---
+    norm = Normalize(vmin=0, vmax=30 / ySampling)
+    cmaps = [cm.curl, cm.thermal, cm.dense, 'mako', cm.solar, cm.haline, 'GnBu_r']
+
+    fig = plt.figure(figsize=(20, 10))
+    ax = fig.add_subplot()
+    ax1 = ax.imshow(result['image'], aspect='auto', cmap=cmaps[0],
+               extent=[endPosition - np.sum(distances), endPosition, -4 * inputBeam[0], 4 * inputBeam[0]], norm = norm)
+    fig.colorbar(ax1, ax = ax)
+
+
+    # --- Plot the Widths on Top of the Intensity Plot ---
+    z_positions = np.linspace(endPosition - np.sum(distances), endPosition, len(ws))
+    colors = ['white'] + ['red'] * (len(Ws) - 1)
+    start_idx = 0
+
+    for i, color in enumerate(colors):
+        end_idx = start_idx + len(Ws[i])
+        plt.plot(z_positions[start_idx:end_idx], Ws[i], color=color, linestyle='--',
+                 linewidth=1.3, label=r'Width ($1/e^2$)' if i == 0 else "")
+        plt.plot(z_positions[start_idx:end_idx], -Ws[i], color=color, linestyle='--', linewidth=1.3)
+        start_idx = end_idx
+    # --- Adding a text box ---
+    '''textstr = f'Final Beam Height = {Ws[-1][-1]:.6g}mm'
+    props = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
+    plt.text(00, -28, textstr, fontsize=10,
+            verticalalignment='top', bbox=props)'''
+    plt.axvline(x=0, color = 'black', linestyle = '--')
+    # --- Add Labels, Title, and Legend ---
+    plt.xlabel('Propagation distance (mm)', fontsize = 30)
+    plt.ylabel('Transverse position (mm)', fontsize = 30)
+    #plt.title('Beam Propagation through 3 Lens System', fontsize = 40)
+    plt.legend(fontsize = 20)
+    if show:
+        plt.show()
+    return fig
+
+
+
+if __name__ == "__main__":
+    # --- Initialization from EFL Finder ---
+    ######
+    #Input the Parameters from Finder function for the trace in the following 
+    ######
+    focal1, focal2, d1, H2, _, _, fEff = (np.float64(-90.9360446598327),
+                                         np.float64(113.67005582479086),
+                                         np.float64(34.224999999997166),
+                                         np.float64(338.55725703435),
+                                         np.float64(72.7822570343472),
+                                         np.float64(0.006563747709002257),
+                                         np.float64(899.5488048382368))
+    focals = [focal1, np.inf, focal2]
+    distances = [d1, 0, H2 + fEff]
+
+    # --- Initialization ---
+    #v0 = np.array([4, 4e-4])
+    '''distances = [14.87499999999979 - 7,7,130.7657770539688 +1199.92437887587]
+    focals = np.array([-136.49500303440888, -9000, 135.9098493557282])'''
+    #distances = [-69.8263 + 152.812, 0, 75]
+    #focals = np.array([-69.8263, np.inf, 152.812])
+    inputBeam = [4, 1e-4]
+    sampling = 0.1
+    ySampling = 1e4
+
+    # --- Trace, Intensity Matching and Plot ---
+    result = trace(distances, focals, inputBeam, sampling, ySampling)
+    print(result['Ws'][0][-1])
+    PlotTrace(result, distances, inputBeam)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:27 2026
+
+Import time budget of the core modules, measured with python -X importtime in a fresh interpreter
+
+@author: thomas
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+# --- Globals ---
+coreModules = ('RayTransfer', 'LensSearch', 'ParallelSearch', 'EFLTools', 'GaussianTrace', 'ThorLabsLenses',
+               'Results', 'SolutionStore', 'LensCatalog')
+heavyModules = ('matplotlib', 'sympy', 'seaborn', 'cmocean', 'scipy', 'pandas')
+importBudget = 0.25 # seconds for the core modules on top of numpy
+
+def ImportTimes(modules=coreModules):
+    # (module, cumulative seconds, nesting depth) for every module loaded by `import numpy; import modules`
+    repository = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, '-X', 'importtime', '-c', 'import numpy; import ' + ', '.join(modules)]
+    env = dict(os.environ, PYTHONPATH=repository + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    stderr = subprocess.run(command, capture_output=True, text=True, env=env, cwd=repository, check=True).stderr
+    times = []
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( +)(\S+)', line)
+        if match:
+            times.append((match.group(4), int(match.group(2)) * 1e-6, (len(match.group(3)) - 1) // 2))
+    return times
+
+def CheckImports(modules=coreModules):
+    # Returns (seconds spent after numpy, heavy packages pulled in)
+    # Only top level entries are summed, their cumulative time already holds the nested imports
+    times = ImportTimes(modules)
+    afterNumpy = [i for i, (name, _, depth) in enumerate(times) if name == 'numpy' and depth == 0][-1] + 1
+    elapsed = sum(seconds for _, seconds, depth in times[afterNumpy:] if depth == 0)
+    heavy = sorted({name.split('.')[0] for name, _, _ in times} & set(heavyModules))
+    return elapsed, heavy
+
+if __name__ == "__main__":
+    elapsed, heavy = CheckImports()
+    print(f'core modules imported in {elapsed * 1e3:.1f} ms (budget {importBudget * 1e3:.0f} ms)')
+    if heavy:
+        print('heavy packages imported:', ', '.join(heavy))
+    sys.exit(elapsed > importBudget or bool(heavy))
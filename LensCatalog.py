@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:15:52 2026
+
+Lens catalogs imported from vendor CSV/JSON lists into a memory mapped .npy store
+The rows are sorted by focal length and a side file indexes material, diameter and sign,
+so a query only touches the matching rows
+
+@author: thomas
+"""
+
+import os
+import csv
+import json
+import sys
+import numpy as np
+from ThorLabsLenses import catalog as thorlabsCatalog, catalogType, materials, lensMaker
+
+# --- Globals ---
+# Accepted column names for every field, the Thorlabs 'help' names included
+columnNames = {
+    'size': ('size', 'Size'),
+    'material': ('material', 'Material'),
+    'partID': ('partID', 'Part', 'Part Number', 'Item #'),
+    'diameter': ('diameter', 'Diameter (mm)'),
+    'focal': ('focal', 'Focal Length (mm)'),
+    'R': ('R', 'Radius of Curvature (mm)'),
+    'thickness': ('thickness', 'Center Thickness (mm)'),
+    'edge': ('edge', 'Edge Thickness (mm)'),
+    'BFL': ('BFL', 'Back Focal Length (mm)'),
+    'clearAperture': ('clearAperture', 'Clear Aperture (mm)'),
+    }
+indexedFields = ('material', 'diameter', 'sign')
+_stores = {} # path -> (records, indexes) opened in this process
+
+def Records(rows, vendor=''):
+    # rows are dictionaries keyed by any of columnNames, missing numbers become NaN
+    records = np.zeros(len(rows), dtype=catalogType)
+    for name, aliases in columnNames.items():
+        numeric = records.dtype[name].kind == 'f'
+        values = []
+        for row in rows:
+            value = next((row[a] for a in aliases if a in row and row[a] not in ('', None)), None)
+            if numeric:
+                values.append(np.nan if value is None else float(str(value).lstrip('>Ø')))
+            else:
+                values.append('' if value is None else str(value))
+        records[name] = values
+    if vendor:
+        records['partID'] = [f'{vendor}/{part}' for part in records['partID']]
+    return records
+
+def ImportFile(path, vendor=''):
+    # One vendor list, .csv with a header row or .json holding a list of objects
+    if path.endswith('.json'):
+        with open(path) as file:
+            rows = json.load(file)
+    else:
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    return Records(rows, vendor)
+
+def Save(records, path):
+    # Sorted by focal length so a focal range is a slice found with np.searchsorted
+    records = np.sort(np.asarray(records, dtype=catalogType), order='focal', kind='stable')
+    np.save(path, records, allow_pickle=False)
+    keys = {'sign': np.sign(records['focal']).astype(int)}
+    keys.update({field: records[field] for field in indexedFields if field != 'sign'})
+    indexes = {f'{field}={value}': np.flatnonzero(keys[field] == value)
+               for field in indexedFields for value in np.unique(keys[field])}
+    np.savez(IndexPath(path), **indexes)
+    _stores.pop(path, None)
+
+def IndexPath(path):
+    return os.path.splitext(path)[0] + '.idx.npz'
+
+def Open(path):
+    # Records are memory mapped, the indexes are small and loaded once per process
+    if path not in _stores:
+        with np.load(IndexPath(path)) as archive:
+            indexes = {key: archive[key] for key in archive.files}
+        _stores[path] = (np.load(path, mmap_mode='r'), indexes)
+    return _stores[path]
+
+def Query(path, material=None, minDiameter=None, maxDiameter=None, sign=None,
+          fMin=-np.inf, fMax=np.inf, maxAbsFocal=None):
+    # Rows matching every given condition, e.g. Query(path, 'FS', minDiameter=25.4, sign=-1, maxAbsFocal=80)
+    records, indexes = Open(path)
+    if maxAbsFocal is not None:
+        fMin, fMax = max(fMin, -maxAbsFocal), min(fMax, maxAbsFocal)
+    start = np.searchsorted(records['focal'], fMin, side='left')
+    stop = np.searchsorted(records['focal'], fMax, side='right')
+    rows = np.arange(start, stop)
+
+    def Lookup(field, accept):
+        values = [key for key in indexes if key.startswith(field + '=') and accept(key.split('=', 1)[1])]
+        return np.unique(np.concatenate([indexes[v] for v in values] or [np.empty(0, dtype=int)]))
+
+    if material is not None:
+        rows = np.intersect1d(rows, Lookup('material', lambda v: v == material), assume_unique=True)
+    if sign is not None:
+        rows = np.intersect1d(rows, Lookup('sign', lambda v: int(v) == np.sign(sign)), assume_unique=True)
+    if minDiameter is not None or maxDiameter is not None:
+        lo = -np.inf if minDiameter is None else minDiameter
+        hi = np.inf if maxDiameter is None else maxDiameter
+        rows = np.intersect1d(rows, Lookup('diameter', lambda v: lo <= float(v) <= hi), assume_unique=True)
+    return records[rows]
+
+def Focals(records, wavelength):
+    # Focal lengths at wavelength (nm) from the plano surface radius, as WavelengthAdapter does
+    focals = np.full(len(records), np.nan)
+    for material, index in materials.items():
+        rows = records['material'] == material
+        focals[rows] = lensMaker(index(wavelength), records['R'][rows], np.inf)
+    return focals
+
+def BuildStore(path, files=(), includeThorLabs=True):
+    # Built in Thorlabs dictionaries plus every (file, vendor) given
+    records = [thorlabsCatalog] if includeThorLabs else []
+    records += [ImportFile(file, vendor) for file, vendor in files]
+    Save(np.concatenate(records) if records else np.zeros(0, dtype=catalogType), path)
+
+if __name__ == "__main__":
+    # python LensCatalog.py store.npy newport.csv:Newport purchased.json:Purchased
+    BuildStore(sys.argv[1], [tuple(arg.split(':', 1)) if ':' in arg else (arg, '') for arg in sys.argv[2:]])
+    print(f'{len(Open(sys.argv[1])[0])} lenses in {sys.argv[1]}')
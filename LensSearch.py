@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 12 10:12:31 2026
+
+Vectorized search kernels shared by the EFL finders
+
+@author: thomas
+"""
+
+import numpy as np
+from importlib.util import find_spec
+import RayTransfer as RT
+
+# --- Globals ---
+blockSize = 2**22 # number of (f1, f2, f3, d1, d2) points evaluated at once
+coarseCells = 64 # cells along each spacing axis at the first level of the adaptive solver
+useNumba = find_spec('numba') is not None # grid EFL scan with the compiled kernels of CompiledSearch
+
+def Triplets(F1, F2, F3):
+    # Flattened lens combinations in the same order as itertools.product
+    f1, f2, f3 = np.meshgrid(np.asarray(F1, dtype=float), np.asarray(F2, dtype=float),
+                             np.asarray(F3, dtype=float), indexing='ij')
+    return f1.ravel(), f2.ravel(), f3.ravel()
+
+def Blocks(nTriplets, n1, n2, blockSize=blockSize):
+    # Yields (triplet slice, d1 slice) so that every block stays under blockSize points
+    # and the solutions come out in the order of product(F1, F2, F3, d1, d2)
+    perTriplet = max(n1 * n2, 1)
+    if perTriplet <= blockSize:
+        step = blockSize // perTriplet
+        for start in range(0, nTriplets, step):
+            yield slice(start, min(start + step, nTriplets)), slice(0, n1)
+    else:
+        rows = max(blockSize // max(n2, 1), 1)
+        for t in range(nTriplets):
+            for start in range(0, n1, rows):
+                yield slice(t, t + 1), slice(start, min(start + rows, n1))
+
+def ThreeLensBlock(f1, f2, f3, d1, d2, d1Max, d2Max, tubeSize, q0, fEff,
+                   wavelength, beamLimit):
+    # f1, f2, f3, d1Max, d2Max have shape (T,) ; d1 (N1,) ; d2 (N2,)
+    d1, d2 = d1[d1 <= d1Max.max()], d2[d2 <= d2Max.max()]
+    if useNumba:
+        import CompiledSearch as Compiled # numba is only imported when a search runs
+        t, i, j, EFL = Compiled.ScanEFL(f1, f2, f3, d1, d2, d1Max, d2Max, fEff)
+        return ThreeLensChecks(f1[t], f2[t], f3[t], d1[i], d2[j], EFL, tubeSize, q0, wavelength, beamLimit)
+    D1, D2 = d1[None, :, None], d2[None, None, :]
+
+    # -------------- Determine appropriate distance ranges ----------------
+    mask = (D1 <= d1Max[:, None, None]) & (D2 <= d2Max[:, None, None])
+
+    # -------------- Determine the EFL for a 3 Lens system ----------------
+    F1, F2, F3 = f1[:, None, None], f2[:, None, None], f3[:, None, None]
+    EFL = ThreeLensEFL(F1, F2, F3, D1, D2)
+
+    # Equivalent to np.isclose(fEff, EFL, atol=1.0) without its temporaries
+    mask &= np.isfinite(EFL)
+    mask &= np.abs(fEff - EFL) <= 1.0 + 1e-5 * np.abs(EFL)
+
+    # Only the points with the correct EFL are carried on to the next checks
+    t, i, j = np.nonzero(mask)
+    return ThreeLensChecks(f1[t], f2[t], f3[t], d1[i], d2[j], EFL[t, i, j], tubeSize, q0,
+                           wavelength, beamLimit)
+
+def ThreeLensExact(f1, f2, f3, d1, d1Max, d2Min, d2Max, tubeSize, q0, fEff,
+                   wavelength, beamLimit):
+    # f1, f2, f3, d1Max, d2Max have shape (T,) ; d1 (N1,)
+    # d2 is solved from the EFL instead of being scanned, d2Min is the bottom of the box
+    d1 = d1[d1 <= d1Max.max()]
+    F1, F2, F3, D1 = f1[:, None], f2[:, None], f3[:, None], d1[None, :]
+    d2 = SolveSpacing3Lens(F1, F2, F3, D1, fEff)
+    mask = (D1 <= d1Max[:, None]) & np.isfinite(d2) & (d2 >= d2Min) & (d2 <= d2Max[:, None])
+
+    t, i = np.nonzero(mask)
+    f1, f2, f3, d1, d2 = f1[t], f2[t], f3[t], d1[i], d2[t, i]
+    EFL = ThreeLensEFL(f1, f2, f3, d1, d2)
+    return ThreeLensChecks(f1, f2, f3, d1, d2, EFL, tubeSize, q0, wavelength, beamLimit)
+
+def ThreeLensChecks(f1, f2, f3, d1, d2, EFL, tubeSize, q0, wavelength, beamLimit):
+    # Tube length and beam radius checks on flat arrays of points with the correct EFL
+    _, H2, radii = RT.Evaluate(np.stack([f1, f2, f3], axis=-1), np.stack([d1, d2], axis=-1), q0, wavelength)
+
+    # Calculate tube length and apply the tube size mask
+    tubeLength = d1 + d2 + H2
+    keep = ~(tubeLength >= tubeSize)
+
+    # Apply width mask on the beam at lens 2 and lens 3
+    lensRadius2, lensRadius3 = radii[:, 1], radii[:, 2]
+    keep &= ~((lensRadius2 > beamLimit) | (lensRadius3 > beamLimit))
+
+    return f1[keep], f2[keep], f3[keep], d1[keep], d2[keep], H2[keep], tubeLength[keep], EFL[keep]
+
+def SolveSpacing2Lens(f1, f2, fEff):
+    # d1 such that 1/fEff = 1/f1 + 1/f2 - d1/(f1 f2)
+    return RT.SolveLastSpacing(RT.Lens(f1), f2, fEff)
+
+def SolveSpacing3Lens(f1, f2, f3, d1, fEff):
+    # d2 for a given d1, the EFL of the system is linear in the last spacing
+    return RT.SolveLastSpacing(RT.Compose(RT.Lens(f1), RT.Propagate(d1), RT.Lens(f2)), f3, fEff)
+
+def ThreeLensPower(f1, f2, f3, d1, d2):
+    # C entry of the system, the front (lens 1 to lens 2) and back (d2 and lens 3) matrices
+    # are small and only this entry of their product is built over the whole block
+    front = RT.Compose(RT.Lens(f1), RT.Propagate(d1), RT.Lens(f2))
+    back = RT.Compose(RT.Propagate(d2), RT.Lens(f3))
+    return np.asarray(RT.Element(back, front, 1, 0))
+
+def ThreeLensEFL(f1, f2, f3, d1, d2):
+    EFL = ThreeLensPower(f1, f2, f3, d1, d2)
+    with np.errstate(divide='ignore'):
+        np.divide(-1, EFL, out=EFL)
+    return EFL
+
+def PowerWindow(fEff):
+    # Range of C = -1/EFL that can pass |fEff - EFL| <= 1 + 1e-5 |EFL|, slightly widened
+    # Returns None when the EFL window contains 0 and C is unbounded
+    slack = 1.0 + 2e-5 * abs(fEff) + 1e-6
+    lo, hi = fEff - slack, fEff + slack
+    if lo <= 0 <= hi:
+        return None
+    cLo, cHi = -1 / lo, -1 / hi
+    return cLo - 1e-9 * abs(cLo) - 1e-15, cHi + 1e-9 * abs(cHi) + 1e-15
+
+def SpacingBounds(f1, f2, f3, d1Lo, d1Hi, d2Lo, d2Hi):
+    # Entrywise bounds of the system matrix over the box [d1Lo, d1Hi] x [d2Lo, d2Hi]
+    # Every entry is bilinear in (d1, d2) so the extremes sit on the corners
+    corners = np.stack([RT.Compose(RT.Lens(f1), RT.Propagate(a), RT.Lens(f2), RT.Propagate(b), RT.Lens(f3))
+                        for a, b in ((d1Lo, d2Lo), (d1Hi, d2Lo), (d1Lo, d2Hi), (d1Hi, d2Hi))])
+    return corners.min(axis=0), corners.max(axis=0)
+
+def FeasibleTriplets(f1, f2, f3, d1Lo, d1Hi, d2Lo, d2Hi, fEff, tubeSize):
+    # Conservative test of every lens combination over its spacing box, False only when
+    # no spacing in the box can give the EFL within tolerance and a tube shorter than tubeSize
+    f1, f2, f3 = (np.asarray(f, dtype=float) for f in (f1, f2, f3))
+    d1Lo, d1Hi, d2Lo, d2Hi = np.broadcast_arrays(*(np.asarray(d, dtype=float) for d in (d1Lo, d1Hi, d2Lo, d2Hi)))
+    feasible = (d1Lo <= d1Hi) & (d2Lo <= d2Hi)
+    window = PowerWindow(fEff)
+    if window is None:
+        return feasible
+    lo, hi = SpacingBounds(f1, f2, f3, d1Lo, d1Hi, d2Lo, d2Hi)
+    cMin, cMax = lo[..., 1, 0], hi[..., 1, 0]
+    feasible &= (cMax >= window[0]) & (cMin <= window[1])
+
+    # On the solutions C is inside the window and keeps its sign, so H2 = (1 - A)/C is
+    # bounded by interval division and the tube is at least d1Lo + d2Lo + min(H2)
+    c0, c1 = np.maximum(cMin, window[0]), np.minimum(cMax, window[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H2 = np.stack([(1 - a) / c for a in (lo[..., 0, 0], hi[..., 0, 0]) for c in (c0, c1)])
+    shortest = d1Lo + d2Lo + H2.min(axis=0)
+    feasible &= ~(shortest - 1e-9 * np.abs(shortest) >= tubeSize)
+    return feasible
+
+def PruneTriplets(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, fEff, tubeSize):
+    # FeasibleTriplets over the part of the spacing grids allowed by the d1Max, d2Max caps
+    if len(d1_range) == 0 or len(d2_range) == 0:
+        return np.zeros(np.shape(f1), dtype=bool)
+    return FeasibleTriplets(f1, f2, f3, np.min(d1_range), np.minimum(d1Max, np.max(d1_range)),
+                            np.min(d2_range), np.minimum(d2Max, np.max(d2_range)), fEff, tubeSize)
+
+def RefineCells(f1, f2, f3, d1, d2, d1Max, d2Max, window, stride, levels=None):
+    # Coarse to fine search of the d1 x d2 grid for the triplets f1, f2, f3 of shape (T,)
+    # A cell (t, i, j, stride) covers the grid points i..i+stride-1 x j..j+stride-1 and C is
+    # bilinear in (d1, d2), so its values over the cell are bracketed by the 4 corners
+    # Returns the (t, i, j) grid points left at stride 1, in product order
+    n1, n2 = len(d1), len(d2)
+    t, i, j = (a.ravel() for a in np.meshgrid(np.arange(len(f1)), np.arange(0, n1, stride),
+                                              np.arange(0, n2, stride), indexing='ij'))
+    while stride > 1:
+        # Corners of every cell, the far side is clipped to the last grid point
+        i1, j1 = np.minimum(i + stride, n1 - 1), np.minimum(j + stride, n2 - 1)
+        F1, F2, F3 = f1[t], f2[t], f3[t]
+        corners = np.stack([ThreeLensPower(F1, F2, F3, d1[a], d2[b])
+                            for a, b in ((i, j), (i1, j), (i, j1), (i1, j1))])
+        keep = (d1[i] <= d1Max[t]) & (d2[j] <= d2Max[t])
+        if window is not None:
+            keep &= (corners.max(axis=0) >= window[0]) & (corners.min(axis=0) <= window[1])
+        if levels is not None:
+            evaluated, kept = levels.get(stride, (0, 0))
+            levels[stride] = (evaluated + 4 * len(t), kept + int(keep.sum()))
+
+        # Every kept cell is split in 4, children falling outside the grid are dropped
+        stride //= 2
+        t, i, j = t[keep], i[keep], j[keep]
+        t = np.repeat(t, 4)
+        i = (i[:, None] + np.array([0, 0, stride, stride])).ravel()
+        j = (j[:, None] + np.array([0, stride, 0, stride])).ravel()
+        inside = (i < n1) & (j < n2)
+        t, i, j = t[inside], i[inside], j[inside]
+
+    order = np.lexsort((j, i, t))
+    return t[order], i[order], j[order]
+
+def ThreeLensAdaptive(f1, f2, f3, d1, d2, d1Max, d2Max, tubeSize, q0, fEff,
+                      wavelength, beamLimit, stride, levels=None):
+    # Same solutions as ThreeLensBlock, only the grid points left by RefineCells are evaluated
+    t, i, j = RefineCells(f1, f2, f3, d1, d2, d1Max, d2Max, PowerWindow(fEff), stride, levels)
+    f1, f2, f3, d1, d2, d1Max, d2Max = f1[t], f2[t], f3[t], d1[i], d2[j], d1Max[t], d2Max[t]
+    EFL = ThreeLensEFL(f1, f2, f3, d1, d2)
+    if levels is not None:
+        evaluated, kept = levels.get(1, (0, 0))
+        levels[1] = (evaluated + len(t), kept)
+
+    mask = (d1 <= d1Max) & (d2 <= d2Max) & np.isfinite(EFL)
+    mask &= np.abs(fEff - EFL) <= 1.0 + 1e-5 * np.abs(EFL)
+    if levels is not None:
+        levels[1] = (levels[1][0], levels[1][1] + int(mask.sum()))
+    return ThreeLensChecks(f1[mask], f2[mask], f3[mask], d1[mask], d2[mask], EFL[mask], tubeSize, q0,
+                           wavelength, beamLimit)
+
+def Search3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0,
+                fEff, wavelength, beamLimit, solver='grid', blockSize=blockSize, levels=None):
+    # Generator over the solution columns of every evaluated block
+    # solver = 'grid' scans d1 x d2, solver = 'exact' scans d1 and solves d2 from the EFL
+    # solver = 'adaptive' refines the grid from coarse cells, levels collects
+    # {stride: (evaluations, cells kept)} when a dict is given
+    f1, f2, f3 = (np.asarray(f, dtype=float) for f in (f1, f2, f3))
+    d1Max, d2Max = np.asarray(d1Max, dtype=float), np.asarray(d2Max, dtype=float)
+    d1_range, d2_range = np.asarray(d1_range, dtype=float), np.asarray(d2_range, dtype=float)
+    if len(d1_range) == 0 or len(d2_range) == 0:
+        return
+
+    # Combinations that cannot reach fEff or fit the tube anywhere in their spacing box are dropped
+    possible = PruneTriplets(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, fEff, tubeSize)
+    f1, f2, f3, d1Max, d2Max = f1[possible], f2[possible], f3[possible], d1Max[possible], d2Max[possible]
+
+    if solver == 'exact':
+        # The d2 box is the span of the grid, the exact d2 only has to land inside it
+        d2Max = np.minimum(d2Max, d2_range.max())
+        for tSlice, dSlice in Blocks(len(f1), len(d1_range), 1, blockSize):
+            yield ThreeLensExact(f1[tSlice], f2[tSlice], f3[tSlice], d1_range[dSlice], d1Max[tSlice],
+                                 d2_range.min(), d2Max[tSlice], tubeSize, q0, fEff,
+                                 wavelength, beamLimit)
+        return
+    if solver == 'adaptive':
+        # The grids have to be sorted for the corners to bracket each cell
+        if np.any(np.diff(d1_range) <= 0) or np.any(np.diff(d2_range) <= 0):
+            raise ValueError("The adaptive solver needs increasing d1_range and d2_range")
+        stride = 2 ** max(int(np.ceil(np.log2(max(len(d1_range), len(d2_range)) / coarseCells))), 0)
+        perTriplet = -(-len(d1_range) // stride) * -(-len(d2_range) // stride)
+        step = max(blockSize // (16 * perTriplet), 1)
+        for start in range(0, len(f1), step):
+            tSlice = slice(start, start + step)
+            yield ThreeLensAdaptive(f1[tSlice], f2[tSlice], f3[tSlice], d1_range, d2_range,
+                                    d1Max[tSlice], d2Max[tSlice], tubeSize, q0, fEff,
+                                    wavelength, beamLimit, stride, levels)
+        return
+    if solver != 'grid':
+        raise ValueError(f"Unknown solver '{solver}', use 'grid', 'exact' or 'adaptive'")
+
+    for tSlice, dSlice in Blocks(len(f1), len(d1_range), len(d2_range), blockSize):
+        yield ThreeLensBlock(f1[tSlice], f2[tSlice], f3[tSlice], d1_range[dSlice], d2_range,
+                             d1Max[tSlice], d2Max[tSlice], tubeSize, q0, fEff,
+                             wavelength, beamLimit)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 14 09:47:02 2026
+
+Process pool backend for the lens searches, the spacing grids live in shared memory
+and every worker runs the vectorized kernels from LensSearch on a batch of lens combinations
+
+@author: thomas
+"""
+
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+import LensSearch as Search
+
+# --- Globals ---
+chunksPerWorker = 4 # batches handed to each worker, keeps the pool busy when batches finish unevenly
+_grids = None # (shared memory, d1_range, d2_range) attached in every worker
+
+def _AttachGrids(name, n1, n2):
+    global _grids
+    shm = shared_memory.SharedMemory(name=name)
+    grid = np.ndarray((n1 + n2,), dtype=float, buffer=shm.buf)
+    _grids = (shm, grid[:n1], grid[n1:])
+    if Search.useNumba:
+        import CompiledSearch as Compiled
+        Compiled.threads = False
+
+def _SearchBatch(f1, f2, f3, d1Max, d2Max, tubeSize, q0, fEff, wavelength, beamLimit, solver):
+    _, d1_range, d2_range = _grids
+    columns = list(zip(*Search.Search3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0,
+                                           fEff, wavelength, beamLimit, solver=solver)))
+    if not columns:
+        return tuple(np.empty(0) for _ in range(8))
+    return tuple(np.concatenate(column) for column in columns)
+
+def ParallelStream3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0, fEff,
+                        wavelength, beamLimit, solver='grid', workers=None, progress=True):
+    # Generator over the solution columns of every batch, batches finishing early are held
+    # back so the stream comes out in product order
+    workers = workers or os.cpu_count()
+    f1, f2, f3 = (np.asarray(f, dtype=float) for f in (f1, f2, f3))
+    d1Max, d2Max = np.asarray(d1Max, dtype=float), np.asarray(d2Max, dtype=float)
+    d1_range, d2_range = np.asarray(d1_range, dtype=float), np.asarray(d2_range, dtype=float)
+
+    # Infeasible combinations are dropped before batching so the batches carry similar work
+    feasible = Search.PruneTriplets(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, fEff, tubeSize)
+    f1, f2, f3, d1Max, d2Max = f1[feasible], f2[feasible], f3[feasible], d1Max[feasible], d2Max[feasible]
+
+    # --- Placing the spacing grids in shared memory once ---
+    n1, n2 = len(d1_range), len(d2_range)
+    shm = shared_memory.SharedMemory(create=True, size=max((n1 + n2) * 8, 8))
+    try:
+        grid = np.ndarray((n1 + n2,), dtype=float, buffer=shm.buf)
+        grid[:n1], grid[n1:] = d1_range, d2_range
+
+        # --- Batches of lens combinations sized to the pool ---
+        batches = np.array_split(np.arange(len(f1)), max(min(workers * chunksPerWorker, len(f1)), 1))
+        pending, nextBatch = {}, 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_AttachGrids,
+                                 initargs=(shm.name, n1, n2)) as executor:
+            futures = {executor.submit(_SearchBatch, f1[b], f2[b], f3[b], d1Max[b], d2Max[b], tubeSize, q0,
+                                       fEff, wavelength, beamLimit, solver): i
+                       for i, b in enumerate(batches)}
+            for future in tqdm(as_completed(futures), total=len(futures), disable=not progress,
+                               desc='Lens Batches'):
+                pending[futures[future]] = future.result()
+                while nextBatch in pending:
+                    yield pending.pop(nextBatch)
+                    nextBatch += 1
+        del grid
+    finally:
+        shm.close()
+        shm.unlink()
+
+def ParallelSearch3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0, fEff,
+                        wavelength, beamLimit, solver='grid', workers=None, progress=True):
+    # Same arguments and solution columns as LensSearch.Search3Lens, concatenated in product order
+    results = list(ParallelStream3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0, fEff,
+                                       wavelength, beamLimit, solver, workers, progress))
+    if not results:
+        return tuple(np.empty(0) for _ in range(8))
+    return tuple(np.concatenate(column) for column in zip(*results))
+
+def MeasureScaling(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0, fEff,
+                   wavelength, beamLimit, solver='grid', maxWorkers=None):
+    # Wall time of the same search from 1 to maxWorkers processes
+    maxWorkers = maxWorkers or os.cpu_count()
+    timings = []
+    for workers in range(1, maxWorkers + 1):
+        start = time.perf_counter()
+        ParallelSearch3Lens(f1, f2, f3, d1_range, d2_range, d1Max, d2Max, tubeSize, q0, fEff,
+                            wavelength, beamLimit, solver=solver, workers=workers, progress=False)
+        elapsed = time.perf_counter() - start
+        timings.append((workers, elapsed))
+        print(f'{workers:3d} workers : {elapsed:8.2f} s   speedup x{timings[0][1] / elapsed:.2f}')
+    return timings
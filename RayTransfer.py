@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 15 14:20:37 2026
+
+Batched ray transfer (ABCD) matrices for thin lens systems with any number of elements
+Every matrix has shape (..., 2, 2) so millions of candidate systems are composed at once
+
+@author: thomas
+"""
+
+import numpy as np
+from numpy import pi as pi
+
+def Lens(f):
+    f = np.asarray(f, dtype=float)
+    M = np.zeros(f.shape + (2, 2))
+    M[..., 0, 0] = 1
+    M[..., 1, 0] = -1 / f
+    M[..., 1, 1] = 1
+    return M
+
+def Propagate(z):
+    z = np.asarray(z, dtype=float)
+    M = np.zeros(z.shape + (2, 2))
+    M[..., 0, 0] = 1
+    M[..., 0, 1] = z
+    M[..., 1, 1] = 1
+    return M
+
+def Element(outer, inner, row, col):
+    # Single entry of outer @ inner, avoids building the full product on large blocks
+    return outer[..., row, 0] * inner[..., 0, col] + outer[..., row, 1] * inner[..., 1, col]
+
+def Product(outer, inner):
+    # outer @ inner written per entry, np.matmul is very slow on stacks of 2x2 matrices
+    shape = np.broadcast_shapes(outer.shape, inner.shape)
+    M = np.empty(shape)
+    for row in range(2):
+        for col in range(2):
+            M[..., row, col] = Element(outer, inner, row, col)
+    return M
+
+def Compose(*matrices):
+    # Matrices are listed in the order the beam meets them
+    system = matrices[0]
+    for M in matrices[1:]:
+        system = Product(M, system)
+    return system
+
+def ChainMatrices(focals, distances):
+    # focals (..., N) and distances (..., N-1) between consecutive lenses
+    # Returns (..., N, 2, 2), the system matrix from the input up to and including every lens
+    focals, distances = np.asarray(focals, dtype=float), np.asarray(distances, dtype=float)
+    system = Lens(focals[..., 0])
+    chain = [system]
+    for i in range(1, focals.shape[-1]):
+        system = Compose(system, Propagate(distances[..., i - 1]), Lens(focals[..., i]))
+        chain.append(system)
+    return np.stack(np.broadcast_arrays(*chain), axis=-3)
+
+def SystemMatrix(focals, distances):
+    return ChainMatrices(focals, distances)[..., -1, :, :]
+
+def EFL(M):
+    with np.errstate(divide='ignore'):
+        return -1 / M[..., 1, 0]
+
+def PrincipalPlane(M):
+    # Distance of the second principal plane from the last element
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1 - M[..., 0, 0]) / M[..., 1, 0]
+
+def TransferQ(q, M):
+    (A, B), (C, D) = (M[..., 0, 0], M[..., 0, 1]), (M[..., 1, 0], M[..., 1, 1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (A * q + B) / (C * q + D)
+
+def BeamRadius(q, wavelength):
+    # |(-pi/wavelength Im(1/q))^(-1/2)| with Im(1/q) = -Im(q)/|q|^2, avoids the complex division
+    # and the float power on long traces, NaN where Im(1/q) > 0 as before
+    q = np.asarray(q)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(1 / np.sqrt(pi / wavelength * q.imag / (q.real**2 + q.imag**2)))
+
+def CurvatureRadius(q):
+    with np.errstate(divide='ignore'):
+        return ((1 / q).real) ** (-1)
+
+def SolveLastSpacing(prefix, f, fEff):
+    # Spacing before the last lens f that gives the system an EFL of fEff
+    # prefix is the system matrix up to the lens before it, C of the full system is linear in that spacing
+    A, C = prefix[..., 0, 0], prefix[..., 1, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (C - A / f + 1 / fEff) * f / C
+
+def Evaluate(focals, distances, q0, wavelength):
+    # EFL, principal plane and the beam radius at every lens for a batch of systems
+    chain = ChainMatrices(focals, distances)
+    system = chain[..., -1, :, :]
+    radii = BeamRadius(TransferQ(np.asarray(q0)[..., None], chain), wavelength)
+    return EFL(system), PrincipalPlane(system), radii
+
+def Trace(q0, focals, distances, sampling, wavelength, chunk=2**16):
+    # Samples the beam every `sampling` after each lens, q(z) = q_lens + z in free space so
+    # every segment is filled with array operations, chunk samples at a time to keep the
+    # temporaries in cache. Segment i starts at lens i and covers distances[i]
+    # Returns z from the first lens, q, w(z), R(z) and the start index of every segment
+
+    # Same sample count as np.arange(0, d + sampling, sampling)
+    counts = np.array([int(np.ceil((d + sampling) / sampling)) for d in distances])
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+    z, q = np.empty(counts.sum()), np.empty(counts.sum(), dtype=complex)
+    w, R = np.empty(counts.sum()), np.empty(counts.sum())
+
+    qLens, offset = complex(q0), 0.0
+    for f, n, start in zip(focals, counts, starts):
+        qLens = complex(TransferQ(qLens, Lens(f)))
+        for a in range(0, n, chunk):
+            local = np.arange(a, min(a + chunk, n)) * sampling
+            block = slice(start + a, start + a + len(local))
+            z[block] = offset + local
+            q[block] = qLens + local
+            w[block] = BeamRadius(q[block], wavelength)
+            R[block] = CurvatureRadius(q[block])
+        # The next lens sits at the last sample of this segment
+        qLens, offset = qLens + (n - 1) * sampling, offset + (n - 1) * sampling
+    return z, q, w, R, starts
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:32:10 2026
+
+Columnar result type of the finders, one record per lens system with named fields
+
+@author: thomas
+"""
+
+import numpy as np
+import RayTransfer as RT
+
+# --- Globals ---
+solutionType = np.dtype([('f1', 'f8'), ('f2', 'f8'), ('f3', 'f8'), ('d1', 'f8'), ('d2', 'f8'),
+                         ('H2', 'f8'), ('tubeLength', 'f8'), ('finalRadius', 'f8'), ('EFL', 'f8'),
+                         ('eflError', 'f8'), ('part1', 'U16'), ('part2', 'U16'), ('part3', 'U16')])
+
+class SolutionSet(np.ndarray):
+    # Structured array of solutionType, boolean masks and field access work as on any array
+    # e.g. solutions[solutions['tubeLength'] < 100].top_k(10, by='finalRadius')
+
+    def __new__(cls, n=0):
+        return np.zeros(n, dtype=solutionType).view(cls)
+
+    def top_k(self, k, by='eflError', largest=False):
+        # The k best records sorted on a field, np.argpartition avoids sorting the whole set
+        key = np.asarray(self[by]) if not largest else -np.asarray(self[by])
+        k = min(k, len(self))
+        if k == 0:
+            return self[:0]
+        best = np.argpartition(key, k - 1)[:k] if k < len(self) else np.arange(len(self))
+        return self[best[np.argsort(key[best], kind='stable')]]
+
+def FinalRadius(focals, distances, H2, q0, fEff, wavelength):
+    # Beam radius at the focal plane, fEff past the second principal plane
+    system = RT.SystemMatrix(focals, distances)
+    return RT.BeamRadius(RT.TransferQ(q0, RT.Compose(system, RT.Propagate(H2 + fEff))), wavelength)
+
+def PartIDs(focals, parts):
+    # Catalog part number of every focal, parts maps focal length to part ID
+    if parts is None:
+        return ''
+    return np.array([parts.get(f, '') for f in np.asarray(focals, dtype=float)], dtype='U16')
+
+def Build(fEff, parts=None, **fields):
+    # SolutionSet from flat columns, missing numeric fields are NaN
+    n = len(next(iter(fields.values())))
+    solutions = SolutionSet(n)
+    for name in solutionType.names[:10]:
+        solutions[name] = fields.get(name, np.nan)
+    solutions['eflError'] = np.abs(solutions['EFL'] - fEff)
+    for i, name in enumerate(('f1', 'f2', 'f3')):
+        solutions[f'part{i + 1}'] = PartIDs(solutions[name], parts)
+    return solutions
+
+def From3Lens(columns, fEff, q0, wavelength, parts=None):
+    # columns are the 8 solution columns of LensSearch.Search3Lens
+    f1, f2, f3, d1, d2, H2, tubeLength, EFL = (np.asarray(c, dtype=float) for c in columns)
+    finalRadius = FinalRadius(np.stack([f1, f2, f3], axis=-1), np.stack([d1, d2], axis=-1), H2, q0,
+                              fEff, wavelength)
+    return Build(fEff, parts, f1=f1, f2=f2, f3=f3, d1=d1, d2=d2, H2=H2, tubeLength=tubeLength,
+                 finalRadius=finalRadius, EFL=EFL)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:05:44 2026
+
+Streaming output of the lens searches, solution batches are appended to an NPZ file
+as they are found so long runs keep little in memory and survive an interruption
+
+@author: thomas
+"""
+
+import os
+import logging
+import zipfile
+import numpy as np
+
+# --- Globals ---
+columns3Lens = ('f1', 'f2', 'f3', 'd1', 'd2', 'H2', 'tubeLength', 'EFL')
+flushRows = 2**16 # rows buffered before a chunk is written
+logger = logging.getLogger('LensSelection')
+
+def AppendNPZ(path, columns, names=columns3Lens):
+    # Adds one chunk to the archive, every column is its own member 'name/000000.npy'
+    with zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_STORED) as archive:
+        chunk = sum(member.startswith(names[0] + '/') for member in archive.namelist())
+        for name, column in zip(names, columns):
+            with archive.open(f'{name}/{chunk:06d}.npy', 'w', force_zip64=True) as member:
+                np.lib.format.write_array(member, np.ascontiguousarray(column), allow_pickle=False)
+
+def LoadNPZ(path, names=None):
+    # Concatenated columns of every chunk, in the order they were written
+    with np.load(path) as archive:
+        members = archive.files # zip order, the order the chunks were written
+        names = names or list(dict.fromkeys(member.split('/')[0] for member in members))
+        return {name: np.concatenate([archive[m] for m in members if m.split('/')[0] == name])
+                for name in names}
+
+def LogHits(batches, names=columns3Lens):
+    # Passes the batches through, every solution is logged at DEBUG level when enabled
+    for batch in batches:
+        if logger.isEnabledFor(logging.DEBUG):
+            for row in zip(*batch):
+                logger.debug(' '.join(f'{name}={value:.6g}' for name, value in zip(names, row)))
+        yield batch
+
+def StreamToNPZ(batches, path, names=columns3Lens, flushRows=flushRows, overwrite=True):
+    # Writes a stream of solution batches to path, at most flushRows rows are held in memory
+    # Returns the number of solutions written
+    if overwrite and os.path.exists(path):
+        os.remove(path)
+    buffered, nBuffered, total = [], 0, 0
+    for batch in batches:
+        buffered.append(batch)
+        nBuffered += len(batch[0])
+        if nBuffered >= flushRows:
+            AppendNPZ(path, [np.concatenate(c) for c in zip(*buffered)], names)
+            total, buffered, nBuffered = total + nBuffered, [], 0
+    if nBuffered or total == 0:
+        columns = [np.concatenate(c) for c in zip(*buffered)] or [np.empty(0) for _ in names]
+        AppendNPZ(path, columns, names)
+        total += nBuffered
+    return total
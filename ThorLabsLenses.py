@@ -9,6 +9,7 @@ Storing all the information from the Thorlabs UV Lenses in a dictionary
 """
 
 import numpy as np
+from functools import lru_cache
 from FusedSilica import FusedSilica, CalciumFluoride
 
 # Dictionary for 1/2" (12.7 mm) UV Fused Silica Bi-Concave Lenses
@@ -23,28 +24,28 @@ lenses_0_5_inch = {
 lenses_1_inch = {
     "help": ["Diameter (mm)", "Focal Length (mm)", "Diopter", "Radius of Curvature (mm)", 
              "Center Thickness (mm)", "Edge Thickness (mm)", "Back Focal Length (mm)"],
-   """-25: np.array([25.4, -25.0, -40.0, -23.5, 3.0, 10.5, -26.0]),
-    -50: np.array([25.4, -50.0, -20.0, -46.6, 3.5, 7.0, -51.2]),
-    -75: np.array([25.4, -75.0, -13.3, -69.6, 3.5, 5.8, -76.2]),
-    -100: np.array([25.4, -100.0, -10.0, -92.6, 3.5, 5.3, -101.2]),
-    35: np.array([25.4, 35.0, 28.6, 31.0, 7.4, 2.0, 32.4]),
-    40: np.array([25.4, 40.0, 25.0, 35.7, 6.7, 2.0, 37.6]),
-    50: np.array([25.4, 50.0, 20.0, 45.1, 5.7, 2.0, 48.0]),
-    75: np.array([25.4, 75.0, 13.3, 68.3, 4.4, 2.0, 73.5]),
-    100: np.array([25.4, 100.0, 10.0, 91.4, 3.8, 2.0, 98.7]),
-    125: np.array([25.4, 125.0, 8.0, 114.5, 3.4, 2.0, 123.8]),
-    150: np.array([25.4, 150.0, 6.7, 137.5, 3.2, 2.0, 148.9]),
-    200: np.array([25.4, 200.0, 5.0, 183.6, 2.9, 2.0, 199.0]),
-    250: np.array([25.4, 250.0, 4.0, 229.6, 2.7, 2.0, 249.1]),
-    300: np.array([25.4, 300.0, 3.3, 275.6, 2.6, 2.0, 299.1]),
-    500: np.array([25.4, 500.0, 2.0, 459.7, 2.4, 2.0, 499.2]),
-    750: np.array([25.4, 750.0, 1.3, 689.8, 2.2, 2.0, 749.2]),
-    1000: np.array([25.4, 1000.0, 1.0, 919.8, 2.2, 2.0, 999.3]),
-    
-    -150: np.array([25.4, -150.0, -6.7, -138.092, 2.5, 3.45, -150.85]),#Newport
-    -200: np.array([25.4, -200.0, -5.0, -183.993, 2.5, 3.21, -200.85]),
-    -250: np.array([25.4, -250.0, -4.0, -229.890, 2.5, 3.07, -250.85]),
-    -1000: np.array([25.4, -1000.0, -1.0, -918.377, 2.5, 2.64, -1000.85])}"""
+    # -25: np.array([25.4, -25.0, -40.0, -23.5, 3.0, 10.5, -26.0]),
+    # -50: np.array([25.4, -50.0, -20.0, -46.6, 3.5, 7.0, -51.2]),
+    # -75: np.array([25.4, -75.0, -13.3, -69.6, 3.5, 5.8, -76.2]),
+    # -100: np.array([25.4, -100.0, -10.0, -92.6, 3.5, 5.3, -101.2]),
+    # 35: np.array([25.4, 35.0, 28.6, 31.0, 7.4, 2.0, 32.4]),
+    # 40: np.array([25.4, 40.0, 25.0, 35.7, 6.7, 2.0, 37.6]),
+    # 50: np.array([25.4, 50.0, 20.0, 45.1, 5.7, 2.0, 48.0]),
+    # 75: np.array([25.4, 75.0, 13.3, 68.3, 4.4, 2.0, 73.5]),
+    # 100: np.array([25.4, 100.0, 10.0, 91.4, 3.8, 2.0, 98.7]),
+    # 125: np.array([25.4, 125.0, 8.0, 114.5, 3.4, 2.0, 123.8]),
+    # 150: np.array([25.4, 150.0, 6.7, 137.5, 3.2, 2.0, 148.9]),
+    # 200: np.array([25.4, 200.0, 5.0, 183.6, 2.9, 2.0, 199.0]),
+    # 250: np.array([25.4, 250.0, 4.0, 229.6, 2.7, 2.0, 249.1]),
+    # 300: np.array([25.4, 300.0, 3.3, 275.6, 2.6, 2.0, 299.1]),
+    # 500: np.array([25.4, 500.0, 2.0, 459.7, 2.4, 2.0, 499.2]),
+    # 750: np.array([25.4, 750.0, 1.3, 689.8, 2.2, 2.0, 749.2]),
+    # 1000: np.array([25.4, 1000.0, 1.0, 919.8, 2.2, 2.0, 999.3]),
+
+    # -150: np.array([25.4, -150.0, -6.7, -138.092, 2.5, 3.45, -150.85]),#Newport
+    # -200: np.array([25.4, -200.0, -5.0, -183.993, 2.5, 3.21, -200.85]),
+    # -250: np.array([25.4, -250.0, -4.0, -229.890, 2.5, 3.07, -250.85]),
+    # -1000: np.array([25.4, -1000.0, -1.0, -918.377, 2.5, 2.64, -1000.85])
 
     "-30.0PCC": np.array([25.4, -30.0, -33.3, -13.8, 3.0, 11.4, -32.1, ">Ø22.86"]),# PlanoConcave
     "-75.0PCC": np.array([25.4, -75.0, -13.3, -34.5, 3.5, 5.9, -77.4, ">Ø22.86"]),
@@ -154,18 +155,6 @@ thorlabsCaF2 = {
     "Purchased" : PurchasedCaF2,
     }
 
-def WavelengthAdapter(wavelength, size = "1 inch"):
-    lensDictFS = thorlabsFusedSilica[size]
-    lensDictCaF2 = thorlabsCaF2[size]
-    
-    nWavelengthFS = FusedSilica(wavelength)
-    nWavelengthCaF2 = CalciumFluoride(wavelength)
-    
-    trueFocals = trueFocal(lensDictFS, nWavelengthFS)
-    trueFocals += trueFocal(lensDictCaF2, nWavelengthCaF2)
-    return trueFocals
-
-
 # Lens maker's formula function
 def lensMaker(n, R1, R2):
     return 1 / ((n - 1) * (1 / R1 - 1 / R2))
@@ -195,6 +184,49 @@ def trueFocal(lens_dict, n):
         trueFocals += [f_true]
     return trueFocals
 
+# --- Compiled catalog ---
+# Every dictionary above as one numeric structured array, rows in the order WavelengthAdapter lists them
+catalogType = np.dtype([('size', 'U10'), ('material', 'U4'), ('partID', 'U32'), ('diameter', 'f8'),
+                        ('focal', 'f8'), ('R', 'f8'), ('thickness', 'f8'), ('edge', 'f8'), ('BFL', 'f8'),
+                        ('clearAperture', 'f8')])
+materials = {"FS": FusedSilica, "CaF2": CalciumFluoride}
+focalCacheSize = 256 # (wavelength, size, material) focal tables kept in memory
+
+def CompileCatalog():
+    rows = []
+    for material, catalog in (("FS", thorlabsFusedSilica), ("CaF2", thorlabsCaF2)):
+        for size, lens_dict in catalog.items():
+            for key, data in lens_dict.items():
+                if key == "help":
+                    continue
+                # Column 7 is the clear aperture written as ">Ø22.86" when present
+                values = [float(x) for x in data[:7]]
+                aperture = float(data[7].lstrip(">Ø")) if len(data) > 7 else np.nan
+                rows.append((size, material, f'{size}/{material}/{key}', values[0], values[1], values[3],
+                             values[4], values[5], values[6], aperture))
+    return np.array(rows, dtype=catalogType)
+
+catalog = CompileCatalog()
+
+@lru_cache(maxsize=focalCacheSize)
+def FocalTable(wavelength, size, material):
+    # Focal lengths at wavelength (nm) of every catalog lens of one size and material
+    R = catalog['R'][(catalog['size'] == size) & (catalog['material'] == material)]
+    focals = lensMaker(materials[material](wavelength), R, np.inf)
+    focals.flags.writeable = False # shared between callers through the cache
+    return focals
+
+def WavelengthAdapter(wavelength, size = "1 inch"):
+    # Focal lengths of the fused silica then CaF2 lenses of a size, a list for a single wavelength
+    # and an array of shape wavelength.shape + (lenses,) for an array of wavelengths
+    if size not in catalog['size']:
+        raise KeyError(f"Unknown lens size '{size}', use one of {sorted(set(catalog['size']))}")
+    if np.ndim(wavelength) == 0:
+        return np.concatenate([FocalTable(float(wavelength), size, m) for m in materials]).tolist()
+    wavelength = np.asarray(wavelength, dtype=float)
+    table = np.array([WavelengthAdapter(w, size) for w in wavelength.ravel()])
+    return table.reshape(wavelength.shape + table.shape[-1:])
+
 if __name__ == "__main__":
     print(WavelengthAdapter(253))
 
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:04:19 2026
+
+Monte Carlo tolerance analysis of finder solutions, every solution x perturbation system is
+evaluated as one batched array computation in chunks sized to a memory budget
+
+@author: thomas
+"""
+
+import numpy as np
+import RayTransfer as RT
+import EFLTools as Tools
+from Chromatic import Systems
+
+# --- Globals ---
+memoryBudget = 256e6 # bytes of temporaries per chunk
+bytesPerSystem = 300 # measured peak temporaries of one perturbed 3 lens system
+statistics = ('EFL', 'H2', 'tubeLength', 'finalRadius')
+yieldType = np.dtype([('yield', 'f8')] + [(f'{s}{m}', 'f8') for s in statistics for m in ('Mean', 'Std')])
+
+def Perturb(rng, focals, distances, inputBeam, samples, sigmaFocal, sigmaSpacing, sigmaWaist, sigmaDivergence):
+    # (S, samples, ...) draws: relative gaussian errors on the focals and the input beam,
+    # absolute gaussian errors in mm on the spacings
+    S = len(focals)
+    f = focals[:, None, :] * (1 + sigmaFocal * rng.standard_normal((S, samples, focals.shape[-1])))
+    d = distances[:, None, :] + sigmaSpacing * rng.standard_normal((S, samples, distances.shape[-1]))
+    wZ = inputBeam[0] * (1 + sigmaWaist * rng.standard_normal((S, samples)))
+    alpha = inputBeam[1] * (1 + sigmaDivergence * rng.standard_normal((S, samples)))
+    return f, d, (wZ, alpha)
+
+def Outcomes(focals, distances, q0, focalPlane, wavelength):
+    # EFL, H2, tube length and the beam radius at the nominal focal plane of perturbed systems
+    system = RT.Lens(focals[..., 0])
+    for i in range(1, focals.shape[-1]):
+        system = RT.Compose(system, RT.Propagate(distances[..., i - 1]), RT.Lens(focals[..., i]))
+    EFL, H2 = RT.EFL(system), RT.PrincipalPlane(system)
+    qFinal = RT.TransferQ(q0, RT.Compose(system, RT.Propagate(focalPlane)))
+    return EFL, H2, distances.sum(axis=-1) + H2, RT.BeamRadius(qFinal, wavelength)
+
+def Yields(solutions, inputBeam, fEff, tubeSize, samples=10**5, sigmaFocal=0.01, sigmaSpacing=0.1,
+           sigmaWaist=0.05, sigmaDivergence=0.1, eflTolerance=1.0, radiusLimit=np.inf,
+           wavelength=253e-6, seed=None, memoryBudget=memoryBudget):
+    # Yield of every solution of a Results.SolutionSet under the perturbations, with the mean and
+    # standard deviation of each outcome. A sample passes when |EFL - fEff| <= eflTolerance,
+    # tube length < tubeSize and the final radius <= radiusLimit
+    rng = np.random.default_rng(seed)
+    focals, distances = Systems(solutions)
+    focalPlane = np.asarray(solutions['H2'] + fEff)[:, None] # detector stays at the nominal focal plane
+    S = len(focals)
+
+    # Sums are taken around the nominal outcome of every solution to avoid cancellation in the variance
+    nominal = Outcomes(focals[:, None, :], distances[:, None, :], Tools.BuildingInput(inputBeam, wavelength=wavelength),
+                       focalPlane, wavelength)
+    shift = {name: np.nan_to_num(values[:, 0]) for name, values in zip(statistics, nominal)}
+    passed = np.zeros(S)
+    sums = {s: np.zeros(S) for s in statistics}
+    squares = {s: np.zeros(S) for s in statistics}
+
+    # --- Chunks of (solutions, samples) within the memory budget ---
+    perChunk = max(int(memoryBudget // bytesPerSystem), 1)
+    sampleStep = min(samples, perChunk)
+    solutionStep = max(perChunk // sampleStep, 1)
+    for s0 in range(0, S, solutionStep):
+        rows = slice(s0, min(s0 + solutionStep, S))
+        for done in range(0, samples, sampleStep):
+            n = min(sampleStep, samples - done)
+            f, d, beam = Perturb(rng, focals[rows], distances[rows], inputBeam, n, sigmaFocal, sigmaSpacing,
+                                 sigmaWaist, sigmaDivergence)
+            q0 = Tools.BuildingInput(beam, wavelength=wavelength)
+            outcomes = dict(zip(statistics, Outcomes(f, d, q0, focalPlane[rows], wavelength)))
+            ok = np.abs(outcomes['EFL'] - fEff) <= eflTolerance
+            ok &= outcomes['tubeLength'] < tubeSize
+            ok &= outcomes['finalRadius'] <= radiusLimit
+            passed[rows] += ok.sum(axis=1)
+            for name, values in outcomes.items():
+                values = values - shift[name][rows, None]
+                sums[name][rows] += values.sum(axis=1)
+                squares[name][rows] += (values**2).sum(axis=1)
+
+    result = np.zeros(S, dtype=yieldType)
+    result['yield'] = passed / samples
+    for name in statistics:
+        mean = sums[name] / samples
+        result[f'{name}Mean'] = shift[name] + mean
+        result[f'{name}Std'] = np.sqrt(np.maximum(squares[name] / samples - mean**2, 0))
+    return result
@@ -0,0 +1,28 @@
+import numpy as np
+
+import Chromatic
+import RayTransfer as RT
+from FusedSilica import FusedSilica
+from ThorLabsLenses import WavelengthAdapter
+from test_results import Solutions
+from test_lens_search import inputBeam
+
+def test_materials_from_catalog():
+    fs, caf2 = WavelengthAdapter(253, 'Purchased')[0], WavelengthAdapter(253, 'Purchased')[-1]
+    assert list(Chromatic.Materials([fs, caf2, 12.345])) == ['FS', 'CaF2', 'FS']
+
+def test_design_wavelength_reproduces_solutions():
+    solutions = Solutions()
+    result = Chromatic.Evaluate(solutions, [253, 248, 266], inputBeam)
+    assert result['EFL'].shape == (3, len(solutions)) and result['radii'].shape == (3, len(solutions), 3)
+    np.testing.assert_allclose(result['EFL'][0], solutions['EFL'], rtol=1e-12)
+    np.testing.assert_allclose(result['focalShift'][0], 0, atol=1e-9)
+
+    # One wavelength by hand, every fused silica focal scales by (n0 - 1)/(n - 1)
+    ratio = (FusedSilica(253) - 1) / (FusedSilica(266) - 1)
+    focals = np.stack([solutions['f1'], solutions['f2'], solutions['f3']], axis=-1) * ratio
+    M = RT.SystemMatrix(focals, np.stack([solutions['d1'], solutions['d2']], axis=-1))
+    np.testing.assert_allclose(result['EFL'][2], RT.EFL(M), rtol=1e-12)
+    shift = RT.PrincipalPlane(M) + RT.EFL(M) - solutions['H2'] - solutions['EFL']
+    np.testing.assert_allclose(result['focalShift'][2], shift, rtol=1e-9)
+    assert np.all(result['focalShift'][2] > 0) # lower index at the longer wavelength
@@ -0,0 +1,27 @@
+import numpy as np
+
+import GaussianTrace
+import ImportTime
+
+focals = [-90.9360446598327, np.inf, 113.67005582479086]
+distances = [34.224999999997166, 0, 338.55725703435 + 899.5488048382368]
+inputBeam = [4, 1e-4]
+
+def test_trace_segments():
+    result = GaussianTrace.trace(distances, focals, inputBeam, sampling=0.1, ySampling=200, width=300)
+    assert [len(w) for w in result['Ws']] == [344, 1, 12383]
+    Qs, Ws = GaussianTrace.waistIdentification(distances, focals, GaussianTrace.BuildingInput(inputBeam), 0.1)
+    for a, b in zip(Ws, result['Ws']):
+        np.testing.assert_array_equal(a, b)
+    assert result['image'].shape == (200, 300) and result['image'].dtype == np.float32
+
+def test_rendered_intensity_matches_complex_field():
+    q = GaussianTrace.trace(distances, focals, inputBeam, render=False)['q']
+    image, columns = GaussianTrace.RenderIntensity(q, inputBeam, ySampling=500, width=80, memoryBudget=500 * 4 * 2 * 7)
+    field = np.abs(GaussianTrace.intensityMatching([q[columns]], inputBeam, ySampling=500))**2
+    np.testing.assert_allclose(image, field / field.sum(axis=0), rtol=1e-4, atol=1e-7)
+
+def test_core_imports_stay_light():
+    elapsed, heavy = ImportTime.CheckImports()
+    assert heavy == []
+    assert elapsed < ImportTime.importBudget
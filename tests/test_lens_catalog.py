@@ -0,0 +1,31 @@
+import json
+import numpy as np
+
+import LensCatalog
+import ThorLabsLenses
+
+def test_store_query_matches_brute_force(tmp_path):
+    csvPath, jsonPath, store = tmp_path / 'newport.csv', tmp_path / 'stock.json', str(tmp_path / 'store.npy')
+    csvPath.write_text('Part Number,Diameter (mm),Focal Length (mm),Radius of Curvature (mm),Material\n'
+                       'KPC043,25.4,-50.0,-22.9,FS\n'
+                       'KPC046,12.7,-25.0,-11.4,FS\n')
+    jsonPath.write_text(json.dumps([{'partID': 'A1', 'diameter': 50.8, 'focal': -75.0, 'R': -34.4,
+                                     'material': 'CaF2'}]))
+    LensCatalog.BuildStore(store, [(str(csvPath), 'Newport'), (str(jsonPath), 'Purchased')])
+    records, _ = LensCatalog.Open(store)
+    assert isinstance(records, np.memmap) and np.all(np.diff(records['focal']) >= 0)
+
+    found = LensCatalog.Query(store, material='FS', minDiameter=25.4, sign=-1, maxAbsFocal=80)
+    expected = records[(records['material'] == 'FS') & (records['diameter'] >= 25.4)
+                       & (records['focal'] < 0) & (np.abs(records['focal']) <= 80)]
+    assert sorted(found['partID']) == sorted(expected['partID'])
+    assert 'Newport/KPC043' in found['partID'] and 'Newport/KPC046' not in found['partID']
+    assert list(LensCatalog.Query(store, material='CaF2', minDiameter=50)['partID']) == ['Purchased/A1']
+
+def test_focals_match_wavelength_adapter(tmp_path):
+    store = str(tmp_path / 'store.npy')
+    LensCatalog.BuildStore(store)
+    records = LensCatalog.Query(store)
+    inch = records['size'] == '1 inch'
+    np.testing.assert_allclose(np.sort(LensCatalog.Focals(records[inch], 253)),
+                               np.sort(ThorLabsLenses.WavelengthAdapter(253, '1 inch')))
@@ -0,0 +1,103 @@
+import numpy as np
+from numpy import pi as pi
+from itertools import product
+
+import EFLTools as Tools
+import LensSearch
+
+# --- Fixed small catalog and grid ---
+F1 = [90.9360446598327, 113.67005582479086]
+F2 = [31.827615630941448, 45.46802232991635, 68.20203349487451]
+F3 = [36.37441786393307, 45.46802232991635, -68.20203349487451]
+d_range = np.arange(5, 150, 1.0)
+inputBeam = [4, 4e-4]
+wavelength = 253e-6
+fEff, tubeSize, beamLimit = 100, 150, 1.3 * inputBeam[0]
+
+def ScalarReference(d2Divisor=3):
+    # One point at a time, the way the original 3 lens finder walked the grid
+    q0 = Tools.BuildingInput(inputBeam)
+    solutions = []
+    for f1, f2, f3, d1, d2 in product(F1, F2, F3, d_range, d_range):
+        if d1 > 2.5 * f1 or d2 > f2 / d2Divisor:
+            continue
+        A = (d1 * (d2 - f2) + f1 * f2 - d2 * (f1 + f2)) / (f1 * f2)
+        B = (d1 + d2 - (d1 * d2) / f2)
+        C = (-f1 * f2 + d2 * (f1 + f2) - f1 * f3 - f2 * f3 + d1 * (-d2 + f2 + f3)) / (f1 * f2 * f3)
+        D = (d1 * (d2 - f2 - f3) + f2 * (-d2 + f3)) / (f2 * f3)
+        EFL = -1 / C
+        if not np.isclose(fEff, EFL, atol=1.0):
+            continue
+        H2 = (1 - A) / C
+        tubeLength = d1 + d2 + H2
+        if tubeLength >= tubeSize:
+            continue
+        qLens3 = (A * q0 + B) / (C * q0 + D)
+        qLens2 = ((1 - d1 / f1) * q0 + d1) / (-(f1 + f2 - d1) / (f1 * f2) * q0 + 1 - d1 / f2)
+        radius3 = np.abs((-pi / wavelength * np.imag(1 / qLens3)) ** (-1 / 2))
+        radius2 = np.abs((-pi / wavelength * np.imag(1 / qLens2)) ** (-1 / 2))
+        if radius2 > beamLimit or radius3 > beamLimit:
+            continue
+        solutions.append((f1, f2, f3, d1, d2, H2, tubeLength, EFL))
+    return np.array(solutions).reshape(-1, 8)
+
+def RunSearch(solver='grid', blockSize=LensSearch.blockSize, levels=None):
+    f1, f2, f3 = LensSearch.Triplets(F1, F2, F3)
+    blocks = LensSearch.Search3Lens(f1, f2, f3, d_range, d_range, 2.5 * f1, f2 / 3, tubeSize,
+                                Tools.BuildingInput(inputBeam), fEff, wavelength, beamLimit,
+                                solver=solver, blockSize=blockSize, levels=levels)
+    columns = [np.concatenate(column) for column in zip(*blocks)]
+    return np.stack(columns, axis=-1) if columns else np.empty((0, 8))
+
+def test_block_kernel_matches_scalar_loop():
+    reference = ScalarReference()
+    assert len(reference) > 0
+    np.testing.assert_allclose(RunSearch(), reference, rtol=1e-9)
+
+def test_small_blocks_keep_product_order():
+    # Blocks smaller than one d1 x d2 plane split d1 but must not reorder solutions
+    np.testing.assert_allclose(RunSearch(blockSize=500), ScalarReference(), rtol=1e-9)
+
+def test_exact_solver_hits_target():
+    solutions = RunSearch(solver='exact')
+    assert len(solutions) > 0
+    f1, f2, f3, d1, d2, H2, tubeLength, EFL = solutions.T
+    np.testing.assert_allclose(EFL, fEff, rtol=1e-12)
+    assert np.all((d2 >= d_range.min()) & (d2 <= np.minimum(f2 / 3, d_range.max())))
+    assert np.all(tubeLength < tubeSize)
+
+    # Every lens combination the exact solver finds is also found on the grid
+    gridTriplets = set(map(tuple, RunSearch()[:, :3]))
+    assert set(map(tuple, solutions[:, :3])) <= gridTriplets
+
+def test_solve_spacing_2_lens():
+    f1, f2 = np.array([-90.0, -68.0]), np.array([113.0, 91.0])
+    d1 = LensSearch.SolveSpacing2Lens(f1, f2, 900)
+    np.testing.assert_allclose(1 / (1 / f1 + 1 / f2 - d1 / (f1 * f2)), 900)
+
+def test_adaptive_solver_matches_grid():
+    levels = {}
+    np.testing.assert_allclose(RunSearch('adaptive', levels=levels), ScalarReference(), rtol=1e-9)
+    evaluations = sum(evaluated for evaluated, _ in levels.values())
+    assert evaluations < 0.5 * len(F1) * len(F2) * len(F3) * len(d_range) ** 2
+
+def test_pruning_keeps_every_solution():
+    f1, f2, f3 = LensSearch.Triplets(F1, F2, F3)
+    feasible = LensSearch.PruneTriplets(f1, f2, f3, d_range, d_range, 2.5 * f1, f2 / 3, fEff, tubeSize)
+    assert 0 < feasible.sum() < len(f1)
+    kept = set(zip(f1[feasible], f2[feasible], f3[feasible]))
+    assert {tuple(row[:3]) for row in ScalarReference()} <= kept
+
+def test_compiled_scan_matches_numpy_mask():
+    # Runs the numba kernels when numba is installed and their Python loops otherwise
+    import CompiledSearch
+    f1, f2, f3 = LensSearch.Triplets(F1, F2, F3)
+    d = d_range[::4]
+    t, i, j, EFL = CompiledSearch.ScanEFL(f1, f2, f3, d, d, 2.5 * f1, f2, fEff)
+    grid = LensSearch.ThreeLensEFL(f1[:, None, None], f2[:, None, None], f3[:, None, None],
+                                   d[None, :, None], d[None, None, :])
+    mask = (d[None, :, None] <= 2.5 * f1[:, None, None]) & (d[None, None, :] <= f2[:, None, None])
+    mask &= np.isfinite(grid) & (np.abs(fEff - grid) <= 1.0 + 1e-5 * np.abs(grid))
+    assert len(t) > 0
+    for a, b in zip((t, i, j, EFL), np.nonzero(mask) + (grid[mask],)):
+        np.testing.assert_array_equal(a, b)
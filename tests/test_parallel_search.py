@@ -0,0 +1,25 @@
+import numpy as np
+
+import EFLTools as Tools
+import LensSearch
+import ParallelSearch
+from test_lens_search import ScalarReference, F1, F2, F3, d_range, inputBeam, wavelength, fEff, tubeSize, beamLimit
+
+def Arguments():
+    f1, f2, f3 = LensSearch.Triplets(F1, F2, F3)
+    return (f1, f2, f3, d_range, d_range, 2.5 * f1, f2, tubeSize, Tools.BuildingInput(inputBeam),
+            fEff, wavelength, beamLimit)
+
+def test_parallel_matches_serial_kernel():
+    serial = [np.concatenate(column) for column in zip(*LensSearch.Search3Lens(*Arguments()))]
+    parallel = ParallelSearch.ParallelSearch3Lens(*Arguments(), workers=2, progress=False)
+    assert len(serial[0]) > 0
+    for a, b in zip(serial, parallel):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_allclose(np.stack(parallel, axis=-1), ScalarReference(d2Divisor=1), rtol=1e-9)
+
+def test_parallel_exact_solver():
+    serial = [np.concatenate(column) for column in zip(*LensSearch.Search3Lens(*Arguments(), solver='exact'))]
+    parallel = ParallelSearch.ParallelSearch3Lens(*Arguments(), solver='exact', workers=2, progress=False)
+    for a, b in zip(serial, parallel):
+        np.testing.assert_array_equal(a, b)
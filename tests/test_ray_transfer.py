@@ -0,0 +1,59 @@
+import numpy as np
+
+import RayTransfer as RT
+
+def test_lens_and_propagate_match_scalar_matrices():
+    np.testing.assert_array_equal(RT.Lens(50.0), [[1, 0], [-1 / 50.0, 1]])
+    np.testing.assert_array_equal(RT.Propagate(12.5), [[1, 12.5], [0, 1]])
+    assert RT.Lens(np.ones((3, 4))).shape == (3, 4, 2, 2)
+
+def test_chain_matches_matrix_products():
+    rng = np.random.default_rng(0)
+    focals = rng.uniform(-200, 200, (50, 4))
+    distances = rng.uniform(5, 150, (50, 3))
+    chain = RT.ChainMatrices(focals, distances)
+    for k in range(50):
+        M = RT.Lens(focals[k, 0])
+        np.testing.assert_allclose(chain[k, 0], M)
+        for i in range(1, 4):
+            M = RT.Lens(focals[k, i]) @ RT.Propagate(distances[k, i - 1]) @ M
+            np.testing.assert_allclose(chain[k, i], M, rtol=1e-12, atol=1e-15)
+
+def test_three_lens_efl():
+    # -1/C of the 3 lens system, the baseline closed form gave 75.95 here
+    M = RT.SystemMatrix([100, 300, 200], [50, 60])
+    np.testing.assert_allclose(RT.EFL(M), 93.75)
+
+def test_two_lens_closed_forms():
+    f1, f2, d1 = -90.0, 113.0, 34.0
+    M = RT.Compose(RT.Lens(f1), RT.Propagate(d1), RT.Lens(f2))
+    A, C = 1 - d1 / f1, -(f1 + f2 - d1) / (f1 * f2)
+    np.testing.assert_allclose(RT.EFL(M), 1 / (1 / f1 + 1 / f2 - d1 / (f1 * f2)))
+    np.testing.assert_allclose(RT.PrincipalPlane(M), (1 - A) / C)
+
+def test_solve_last_spacing():
+    prefix = RT.Compose(RT.Lens(80.0), RT.Propagate(30.0), RT.Lens(-40.0))
+    d = RT.SolveLastSpacing(prefix, 120.0, 600)
+    np.testing.assert_allclose(RT.EFL(RT.Compose(prefix, RT.Propagate(d), RT.Lens(120.0))), 600)
+
+def test_transfer_free_space():
+    q = 10 + 1j * 300
+    np.testing.assert_allclose(RT.TransferQ(q, RT.Propagate(25.0)), q + 25)
+
+def test_trace_matches_matrix_products():
+    q0, wavelength = -150 + 2e5j, 253e-6
+    focals, distances = [-90.9360446598327, np.inf, 113.67005582479086], [34.225, 0, 400.0]
+    z, q, w, R, starts = RT.Trace(q0, focals, distances, 0.5, wavelength, chunk=64)
+    assert list(starts) == [0, 70, 71] and len(z) == 71 + len(np.arange(0, 400.5, 0.5))
+
+    # Sample by sample with the full system matrix, as waistIdentification used to
+    total = np.eye(2)
+    for i, (f, d) in enumerate(zip(focals, distances)):
+        Z = np.arange(0, d + 0.5, 0.5)
+        for k in (0, len(Z) // 2, len(Z) - 1):
+            M = RT.Product(RT.Propagate(Z[k]), RT.Product(RT.Lens(f), total))
+            np.testing.assert_allclose(q[starts[i] + k], RT.TransferQ(q0, M), rtol=1e-12)
+        total = RT.Product(RT.Propagate(Z[-1]), RT.Product(RT.Lens(f), total))
+    np.testing.assert_allclose(w, np.abs((-np.pi / wavelength * np.imag(1 / q)) ** (-1 / 2)), rtol=1e-12)
+    np.testing.assert_allclose(R, 1 / (1 / q).real, rtol=1e-12)
+    assert np.all(np.diff(z) >= 0)
@@ -0,0 +1,33 @@
+import numpy as np
+from numpy import pi as pi
+
+import EFLTools as Tools
+import Results
+from test_lens_search import RunSearch, inputBeam, wavelength, fEff
+
+def Solutions():
+    return Results.From3Lens(RunSearch().T, fEff, Tools.BuildingInput(inputBeam), wavelength,
+                             parts={45.46802232991635: 'LA4545-UV'})
+
+def test_fields_and_final_radius():
+    solutions = Solutions()
+    assert len(solutions) > 0 and isinstance(solutions, Results.SolutionSet)
+    np.testing.assert_allclose(solutions['eflError'], np.abs(solutions['EFL'] - fEff))
+    assert set(solutions['part2'][solutions['f2'] == 45.46802232991635]) == {'LA4545-UV'}
+
+    # Scalar trace of the first solution to the focal plane
+    s = solutions[0]
+    q = Tools.BuildingInput(inputBeam)
+    for f, d in ((s['f1'], s['d1']), (s['f2'], s['d2']), (s['f3'], s['H2'] + fEff)):
+        q = q / (1 - q / f) + d
+    np.testing.assert_allclose(s['finalRadius'], np.abs((-pi / wavelength * np.imag(1 / q)) ** (-1 / 2)))
+
+def test_top_k_matches_full_sort():
+    solutions = Solutions()
+    for by, largest in (('eflError', False), ('tubeLength', True)):
+        order = np.argsort(solutions[by] * (-1 if largest else 1), kind='stable')
+        np.testing.assert_array_equal(np.sort(solutions.top_k(5, by, largest)[by]),
+                                      np.sort(solutions[order[:5]][by]))
+    assert len(solutions.top_k(10**6)) == len(solutions)
+    short = solutions[solutions['tubeLength'] < np.median(solutions['tubeLength'])]
+    assert isinstance(short, Results.SolutionSet) and len(short.top_k(3, by='finalRadius')) == 3
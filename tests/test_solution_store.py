@@ -0,0 +1,31 @@
+import logging
+import numpy as np
+
+import SolutionStore as Store
+from test_lens_search import RunSearch, ScalarReference
+
+def Batches(solutions, size):
+    for start in range(0, len(solutions), size):
+        yield tuple(solutions[start:start + size].T)
+
+def test_npz_stream_round_trip(tmp_path):
+    solutions = ScalarReference()
+    path = tmp_path / 'solutions.npz'
+    assert Store.StreamToNPZ(Batches(solutions, 7), path, flushRows=10) == len(solutions)
+    columns = Store.LoadNPZ(path)
+    assert list(columns) == list(Store.columns3Lens)
+    np.testing.assert_array_equal(np.stack(list(columns.values()), axis=-1), solutions)
+
+def test_empty_stream_still_writes_columns(tmp_path):
+    path = tmp_path / 'empty.npz'
+    assert Store.StreamToNPZ(iter(()), path) == 0
+    assert all(len(column) == 0 for column in Store.LoadNPZ(path).values())
+
+def test_hits_are_only_logged_at_debug(caplog):
+    solutions = RunSearch()
+    with caplog.at_level(logging.INFO, logger=Store.logger.name):
+        list(Store.LogHits(Batches(solutions, 5)))
+    assert not caplog.records
+    with caplog.at_level(logging.DEBUG, logger=Store.logger.name):
+        list(Store.LogHits(Batches(solutions, 5)))
+    assert len(caplog.records) == len(solutions)
@@ -0,0 +1,27 @@
+import numpy as np
+
+import ThorLabsLenses as Catalog
+from FusedSilica import FusedSilica
+
+def test_catalog_is_numeric():
+    assert Catalog.catalog['R'].dtype == float and np.all(np.isfinite(Catalog.catalog['R']))
+    assert len(set(Catalog.catalog['partID'])) == len(Catalog.catalog)
+
+def test_adapter_matches_dictionaries():
+    for size in ('1 inch', 'Purchased'):
+        expected = Catalog.trueFocal(Catalog.thorlabsFusedSilica[size], FusedSilica(253))
+        expected += Catalog.trueFocal(Catalog.thorlabsCaF2[size], Catalog.CalciumFluoride(253))
+        assert Catalog.WavelengthAdapter(253, size) == expected
+
+def test_sizes_without_caf2():
+    # Fused silica only, the old adapter raised KeyError on these sizes
+    for size in ('0.5 inch', '2_inch'):
+        R = [data[3] for key, data in Catalog.thorlabsFusedSilica[size].items() if key != 'help']
+        np.testing.assert_allclose(Catalog.WavelengthAdapter(253, size), np.array(R) / (FusedSilica(253) - 1))
+
+def test_adapter_broadcasts_and_caches():
+    Catalog.FocalTable.cache_clear()
+    table = Catalog.WavelengthAdapter(np.array([[253, 532]]), 'Purchased')
+    assert table.shape == (1, 2, 4)
+    np.testing.assert_array_equal(table[0, 1], Catalog.WavelengthAdapter(532, 'Purchased'))
+    assert Catalog.FocalTable.cache_info().hits >= 2
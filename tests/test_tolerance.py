@@ -0,0 +1,23 @@
+import numpy as np
+
+import Tolerance
+from test_results import Solutions
+from test_lens_search import inputBeam, fEff, tubeSize
+
+def test_no_perturbation_gives_nominal_outcomes():
+    solutions = Solutions()
+    result = Tolerance.Yields(solutions, inputBeam, fEff, tubeSize, samples=50, sigmaFocal=0, sigmaSpacing=0,
+                              sigmaWaist=0, sigmaDivergence=0, memoryBudget=64 * Tolerance.bytesPerSystem)
+    np.testing.assert_allclose(result['EFLMean'], solutions['EFL'], rtol=1e-12)
+    np.testing.assert_allclose(result['tubeLengthMean'], solutions['tubeLength'], rtol=1e-12)
+    np.testing.assert_allclose(result['EFLStd'], 0, atol=1e-6)
+    np.testing.assert_array_equal(result['yield'], 1.0)
+
+def test_yield_drops_with_spacing_errors():
+    solutions = Solutions()
+    loose = Tolerance.Yields(solutions, inputBeam, fEff, tubeSize, samples=2000, sigmaSpacing=1.0, seed=1)
+    tight = Tolerance.Yields(solutions, inputBeam, fEff, tubeSize, samples=2000, sigmaSpacing=0.01,
+                             sigmaFocal=1e-4, seed=1)
+    assert np.all(loose['yield'] < tight['yield']) and np.all(loose['EFLStd'] > tight['EFLStd'])
+    again = Tolerance.Yields(solutions, inputBeam, fEff, tubeSize, samples=2000, sigmaSpacing=1.0, seed=1)
+    np.testing.assert_array_equal(loose, again)